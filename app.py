@@ -1,101 +1,161 @@
-import concurrent.futures
-import io
-import sqlite3
-import time
-import zipfile
-from datetime import datetime
+import importlib
+import threading
 
-import pandas as pd
-import plotly.express as px  # Tambahan untuk Bar Chart Summary
-import plotly.graph_objects as go
-import requests
 import streamlit as st
-import urllib3
-
-# --- MATIKAN WARNING SSL ---
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(
     layout="wide", page_title="Wifi.id Usage Dashboard v7.0", page_icon="🏆"
 )
 
-# --- DATABASE SETUP ---
-DB_NAME = "wifi_locations.db"
+# --- CREDENTIALS (SECURE) ---
+# Mengambil data user & password dari Streamlit Secrets
+# Jika dijalankan lokal, dia baca .streamlit/secrets.toml
+# Jika di Cloud, dia baca dari menu Settings -> Secrets
+try:
+    USERS = st.secrets["users"]
+except FileNotFoundError:
+    st.error("Settingan Password belum ada! Mohon konfigurasi Secrets terlebih dahulu.")
+    st.stop()
 
 
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS locations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_name TEXT,
-            loc_id TEXT,
-            site_name TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-
-def save_to_db(df, project_name):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("DELETE FROM locations WHERE project_name = ?", (project_name,))
-    data_tuples = [
-        (project_name, row["LOC_ID"], row["SITE_NAME"]) for _, row in df.iterrows()
-    ]
-    c.executemany(
-        "INSERT INTO locations (project_name, loc_id, site_name) VALUES (?, ?, ?)",
-        data_tuples,
-    )
-    conn.commit()
-    conn.close()
+# --- SECURITY (LOGIN) ---
+def check_authentication():
+    if "authenticated" not in st.session_state:
+        st.session_state["authenticated"] = False
+    if not st.session_state["authenticated"]:
+        st.header("🔐 Login Dashboard")
+        with st.form("login_form"):
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
+            if st.form_submit_button("Login"):
+                if username in USERS and USERS[username] == password:
+                    st.session_state["authenticated"] = True
+                    st.session_state["user"] = username
+                    st.rerun()
+                else:
+                    st.error("Login Gagal")
+        return False
+    return True
+
+
+# --- COLD START ---
+# Halaman login dirender sebelum modul berat (pandas, aiohttp, reports, ...)
+# di-import, jadi tampil cepat setelah container restart. Selagi user mengetik
+# password, modul-modul itu di-import di thread background (sekali per proses).
+# Proses renderer PNG (kaleido) baru dinyalakan saat bulk ZIP pertama.
+PRELOAD_MODULES = [
+    "pandas",
+    "aiohttp",
+    "plotly.graph_objects",
+    "database",
+    "reports",
+    "background",
+    "importer",
+]
+
+
+@st.cache_resource
+def preload_modules():
+    def run():
+        for name in PRELOAD_MODULES:
+            importlib.import_module(name)
+
+    thread = threading.Thread(target=run, name="preload-modules", daemon=True)
+    thread.start()
+    return thread
+
+
+# Jaga-jaga kalau ada proses multiprocessing (spawn) lain yang menjalankan file
+# ini sebagai __mp_main__ (worker renderer sendiri tidak, lihat renderer.py):
+# tanpa script context st.stop() tidak berhenti, jadi preload / setup dijaga.
+if not check_authentication():
+    if __name__ == "__main__":
+        preload_modules()
+    st.stop()
 
+import os
+import sqlite3
+from datetime import datetime
 
-def load_from_db(project_name):
-    conn = sqlite3.connect(DB_NAME)
-    query = "SELECT loc_id, site_name FROM locations WHERE project_name = ?"
-    df = pd.read_sql_query(query, conn, params=(project_name,))
-    conn.close()
-    if not df.empty:
-        df.columns = ["LOC_ID", "SITE_NAME"]
-    return df
+import pandas as pd
+import urllib3
 
+import background
+import fetch_engine
+import importer
+import jobs
+import metrics
+import reports
+import summary
+import usage_series
+import usage_store
+import warmer
+import wifi_api
+from charts import create_chart
+from concurrency import AimdController, format_stats
+from config import DB_NAME, PROJECT_CONFIG
+from database import (
+    delete_project_data,
+    init_db,
+    load_from_db,
+    load_location_index,
+    save_session,
+)
+from location_index import PAGE_SIZE
+from singleflight import usage_flight, usage_key
+from usage_cache import usage_cache
+
+# Label pilihan granularitas chart (nilai dari usage_series)
+GRANULARITY_LABELS = {
+    usage_series.AUTO: "Auto",
+    usage_series.DAILY: "Harian",
+    usage_series.WEEKLY: "Mingguan",
+    usage_series.MONTHLY: "Bulanan",
+}
 
-def delete_project_data(project_name):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("DELETE FROM locations WHERE project_name = ?", (project_name,))
-    conn.commit()
-    conn.close()
 
+# --- SETUP SEKALI PER PROSES ---
+# Bukan per script run: schema DB, endpoint Prometheus (thread daemon) dan
+# warmer malam hari (WARM_HOUR=-1 mati). Dipanggil di dalam blok MAIN APP,
+# bukan top-level, supaya tidak ikut jalan di proses anak (lihat di atas).
+@st.cache_resource
+def setup_process():
+    # --- MATIKAN WARNING SSL ---
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    init_db()
+    return {
+        "metrics_port": metrics.start_http_server(),
+        "warmer_enabled": warmer.start_scheduler(DB_NAME),
+    }
 
-init_db()
 
 # --- INISIALISASI SESSION STATE ---
 if "project_sessions" not in st.session_state:
     st.session_state["project_sessions"] = {}
+if "active_jobs" not in st.session_state:
+    st.session_state["active_jobs"] = {}
+
+# Batas request paralel ke wifi.id (async, bukan jumlah thread lagi)
+# None = Auto: limit diatur AIMD controller sesuai latency & error rate
+CONCURRENCY_MODES = {
+    "Auto (Adaptif)": None,
+    "Safe Mode (Stabil)": 4,
+    "Turbo Mode (Cepat)": fetch_engine.DEFAULT_MAX_IN_FLIGHT,
+}
 
-# --- CONFIG PROYEK ---
-PROJECT_CONFIG = {
-    "Kecamatan Berdaya": {"vo_id": "15557"},
-    "Pendidikan": {"vo_id": "13231"},
-    "Pelayanan Publik": {"vo_id": "12945"},
-    "WMS POLDA Jawa Tengah": {"vo_id": "13329"},
-    "Lainnya": {"vo_id": "15557"},
+# Format hasil bulk -> suffix file (lihat reports.run_bulk_report / run_html_report)
+BULK_FORMATS = {
+    "ZIP (PNG per lokasi)": ".zip",
+    "HTML (satu file, chart interaktif)": ".html",
 }
 
-# --- CREDENTIALS (SECURE) ---
-# Mengambil data user & password dari Streamlit Secrets
-# Jika dijalankan lokal, dia baca .streamlit/secrets.toml
-# Jika di Cloud, dia baca dari menu Settings -> Secrets
-try:
-    USERS = st.secrets["users"]
-except FileNotFoundError:
-    st.error("Settingan Password belum ada! Mohon konfigurasi Secrets terlebih dahulu.")
-    st.stop()
+
+def make_controller(mode):
+    limit = CONCURRENCY_MODES[mode]
+    if limit is None:
+        return AimdController()
+    return AimdController.fixed(limit)
 
 
 # --- 1. FUNGSI FETCH DATA ---
@@ -173,238 +233,246 @@ except FileNotFoundError:
 
 #     return None
 
-# --- IMPORTS ---
-# Pastikan ada import ini di atas
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-
 # --- SETUP SESSION GLOBAL (Supaya koneksi tidak putus-nyambung) ---
+# Satu HTTP session per proses, dipakai bersama semua session browser
 def get_session():
-    if "request_session" not in st.session_state:
-        session = requests.Session()
-        retries = Retry(
-            total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504]
-        )
-        session.mount("https://", HTTPAdapter(max_retries=retries))
-        st.session_state["request_session"] = session
-    return st.session_state["request_session"]
+    return wifi_api.get_http_session()
 
 
 # --- 1. FUNGSI FETCH DATA (OPTIMIZED + CACHING) ---
-# @st.cache_data membuat data tersimpan di RAM server selama 1 jam (ttl=3600)
-# Jadi kalau diklik ulang, tidak perlu fetch ke wifi.id lagi.
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_usage_data(session_id, vo_id, loc_id, start_date, end_date):
-    url = "https://venue.wifi.id/vdash/dashboard/plinechart?"
-
-    # Gunakan Session yang persisten
-    s = get_session()
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Cookie": f"PHPSESSID={session_id}",
-        "X-Requested-With": "XMLHttpRequest",
-        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-    }
-
-    s_date_clean = start_date.strftime("%Y%m%d")
-    e_date_clean = end_date.strftime("%Y%m%d")
-
-    payload = {
-        "optionsRadios": "3",
-        "startdate": s_date_clean,
-        "enddate": e_date_clean,
-        "rr": "3",
-        "vo": vo_id,
-        "level": "l2",
-        "locid": loc_id,
-        "namasite": "JATENG",
-        "ap": "",
-        "kota": "",
-        "ssid": "",
-        "sitename": "",
-    }
+# usage_cache menyimpan data di RAM server selama 1 jam (batas USAGE_CACHE_MB),
+# dipakai bersama semua user & job. Jadi kalau diklik ulang, tidak perlu fetch
+# ke wifi.id lagi. Di bawahnya ada usage_store (SQLite): hanya tanggal yang
+# belum tersimpan (plus beberapa hari terakhir yang belum settle) yang ditarik.
+# Hasilnya UsageSeries harian: metric dihitung dari data harian, chart dari
+# series yang sudah diringkas (resample) sesuai granularitas yang dipilih.
+def fetch_usage_series(session_id, vo_id, loc_id, start_date, end_date):
+    key = usage_key(vo_id, loc_id, start_date, end_date)
+    series = usage_cache.get(key)
+    if series is not None:
+        return series
+
+    def fetch():
+        return usage_store.fetch_series_with_store(
+            DB_NAME,
+            lambda s_date, e_date: wifi_api.fetch_daily_records(
+                get_session(), session_id, vo_id, loc_id, s_date, e_date
+            ),
+            vo_id,
+            loc_id,
+            start_date,
+            end_date,
+        )
 
+    # Single-flight: request identik yang sedang jalan tidak dikirim dua kali
+    # (hasil dibagi sebagai UsageSeries, sama dengan fetch_engine)
     try:
-        # Timeout dinaikkan ke 60 detik karena server USA ke Indo pasti delay
-        response = s.post(url, headers=headers, data=payload, verify=False, timeout=60)
+        series = usage_flight.do(key, fetch)
+    except sqlite3.Error:
+        return None
+    if series is None:
+        return None
+    usage_cache.put(key, series)
+    return series
 
-        if response.status_code != 200:
-            return None
 
-        try:
-            data = response.json()
-        except ValueError:
-            return None
+# --- 5. BACKGROUND JOB (POLLING STATUS) ---
+JOB_POLL_SECONDS = 2
 
-        if not data:
-            return pd.DataFrame()
 
-        df = pd.DataFrame(data)
-        if "PERIODE" in df.columns:
-            df["date"] = pd.to_datetime(df["PERIODE"], format="%Y%m%d", errors="coerce")
+def job_label(project_name, s_date, e_date):
+    return f"{project_name} ({s_date.strftime('%d/%m/%Y')} - {e_date.strftime('%d/%m/%Y')})"
 
-            # Optimasi tipe data biar hemat RAM server
-            if "USAGES" in df.columns:
-                df["usage_bytes"] = pd.to_numeric(df["USAGES"], errors="coerce").fillna(
-                    0
-                )
-                df["total_usage_gb"] = df["usage_bytes"] / (1024**3)
-            else:
-                df["total_usage_gb"] = 0.0
 
-            if "TRAFIK" in df.columns:
-                df["connected_user"] = (
-                    pd.to_numeric(df["TRAFIK"], errors="coerce").fillna(0).astype(int)
-                )
-            else:
-                df["connected_user"] = 0
+def get_session_job(kind, project_name):
+    # Job terakhir yang dijalankan / ditempeli session ini
+    job_id = st.session_state["active_jobs"].get(f"{kind}:{project_name}")
+    return background.get_executor().get(job_id) if job_id else None
 
-            df = df.sort_values("date")
-            # Return hanya kolom penting biar cache enteng
-            return df[["date", "connected_user", "total_usage_gb"]]
-        else:
-            return pd.DataFrame()
 
-    except Exception:
-        return None
+def set_session_job(kind, project_name, job):
+    st.session_state["active_jobs"][f"{kind}:{project_name}"] = job.job_id
 
 
-# --- 2. FUNGSI CHART ---
-def create_chart(df, title_text):
-    df["date_str"] = df["date"].dt.strftime("%d %b")
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=df["date_str"],
-            y=df["connected_user"],
-            name="Connected User",
-            mode="lines+markers",
-            line=dict(color="#2980b9", width=5, shape="spline"),
-            marker=dict(size=8),
-            yaxis="y",
-        )
+def summary_metrics(df_summary, total_locations):
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Total Usage Project",
+        f"{df_summary['Total Usage (GB)'].sum():,.2f} GB",
+    )
+    col2.metric("Lokasi Aktif", f"{len(df_summary)} / {total_locations} Titik")
+    col3.metric("Peak User (Lokasi)", f"{df_summary['Peak User'].max():,}")
+
+
+def partial_summary(job):
+    # Hasil sementara summary: total berjalan, leaderboard & tabel yang terus
+    # terisi selagi fetch jalan (snapshot dari job, tidak menunggu lokasi terakhir)
+    df_partial = job.partial
+    if df_partial is None or df_partial.empty:
+        return
+    st.caption(
+        f"⏳ Hasil sementara dari {job.done}/{job.total} lokasi, diperbarui otomatis"
+    )
+    summary_metrics(df_partial, job.total)
+    st.markdown("**🏆 Top 10 Sementara**")
+    st.dataframe(summary.top_n(df_partial, 10), width="stretch", hide_index=True)
+    with st.expander(f"📋 Data Sementara ({len(df_partial)} lokasi)"):
+        st.dataframe(df_partial, width="stretch", hide_index=True)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_job(job_id):
+    job = background.get_executor().get(job_id)
+    if job is None:
+        return
+    if not job.active:
+        # Selesai: render ulang halaman penuh untuk menampilkan hasil
+        st.rerun()
+
+    st.progress(job.fraction)
+    status = f"Processing {job.done}/{job.total}..."
+    if job.controller is not None:
+        status += f" {format_stats(job.controller)}"
+    st.text(status)
+    if job.attached:
+        st.caption(f"👥 {job.attached} request identik ikut memakai job ini")
+    partial_summary(job)
+
+
+# --- 6. REKAP SEMUA PROYEK ---
+def all_projects_summary_section(d_range):
+    st.markdown("### 🌐 Rekap Semua Proyek")
+    st.caption(
+        "Satu run fetch untuk semua proyek di database. Lokasi yang sama di beberapa "
+        "proyek hanya ditarik sekali. Session ID diambil dari isian sidebar tiap proyek."
     )
-    fig.add_trace(
-        go.Scatter(
-            x=df["date_str"],
-            y=df["total_usage_gb"],
-            name="Total Usage (GB)",
-            mode="lines+markers",
-            line=dict(color="#c0392b", width=5, shape="spline"),
-            marker=dict(size=8),
-            yaxis="y2",
+    sessions = {p: s for p, s in st.session_state["project_sessions"].items() if s}
+    missing = [p for p in PROJECT_CONFIG if p not in sessions]
+    if missing:
+        st.caption(f"⚠️ Belum ada Session ID (dilewati): {', '.join(missing)}")
+
+    all_job = get_session_job("summary-all", "*")
+
+    if len(d_range) == 2 and st.button("Generate Rekap Semua Proyek"):
+        if not sessions:
+            st.error("Session ID Kosong!")
+            st.stop()
+
+        s_date, e_date = d_range
+        all_job = background.get_executor().submit(
+            "summary-all",
+            background.job_key("summary-all", "all", sessions.keys(), s_date, e_date),
+            job_label("Semua Proyek", s_date, e_date),
+            reports.all_projects_summary_job,
+            DB_NAME,
+            sessions,
+            s_date,
+            e_date,
+            controller=make_controller("Auto (Adaptif)"),
         )
+        set_session_job("summary-all", "*", all_job)
+
+    if not all_job:
+        return
+    st.caption(f"Job: {all_job.label}")
+    if all_job.active:
+        poll_job(all_job.job_id)
+        return
+    if all_job.status == background.FAILED:
+        st.error(f"Job gagal: {all_job.error}")
+        return
+
+    result = all_job.result
+    df_all = result["summary"]
+    for project_name, reason in result["invalid_sessions"].items():
+        st.warning(f"Dilewati ({reason}): {project_name}. Cek Session ID di sidebar.")
+    if result["failures"]:
+        st.caption(f"Tidak masuk rekap: {reports.format_failures(result['failures'])}")
+    if df_all.empty:
+        st.error("Gagal mengambil data rekap. Pastikan Session ID Valid.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Usage (Semua Proyek)", f"{result['total_usage_gb']:,.2f} GB")
+    col2.metric(
+        "Lokasi Aktif",
+        f"{df_all['LOC ID'].nunique()} / {result['unique_locations']} Titik Unik",
     )
-    fig.update_layout(
-        title=dict(
-            text=title_text,
-            font=dict(size=22, color="black"),
-            y=0.95,
-            x=0.01,
-            xanchor="left",
-            yanchor="top",
-        ),
-        margin=dict(l=50, r=50, t=150, b=50),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="left",
-            x=0,
-            font=dict(size=14),
-        ),
-        xaxis=dict(
-            type="category", showgrid=False, tickangle=-45, tickfont=dict(size=12)
-        ),
-        yaxis=dict(
-            title=dict(text="Connected User", font=dict(color="#2980b9", size=14)),
-            tickfont=dict(color="#2980b9", size=12),
-        ),
-        yaxis2=dict(
-            title=dict(text="Total Usage (GB)", font=dict(color="#c0392b", size=14)),
-            tickfont=dict(color="#c0392b", size=12),
-            overlaying="y",
-            side="right",
-            showgrid=False,
-        ),
-        template="plotly_white",
-        hovermode="x unified",
+    col3.metric("Lokasi Dipakai Bersama", f"{result['shared_locations']}")
+    if result["skipped_projects"]:
+        st.warning(
+            f"Dilewati (tanpa Session ID): {', '.join(result['skipped_projects'])}"
+        )
+
+    st.subheader("📊 Subtotal per Proyek")
+    st.dataframe(result["subtotals"], width="stretch", hide_index=True)
+
+    st.subheader("🏆 Top 10 Lokasi (Semua Proyek)")
+    st.dataframe(summary.top_n(df_all, 10), width="stretch", hide_index=True)
+
+    with st.expander(f"📋 Data Lengkap ({len(df_all)} baris)"):
+        st.dataframe(df_all, width="stretch", hide_index=True)
+    st.download_button(
+        "💾 Download CSV",
+        lambda: df_all.to_csv(index=False).encode("utf-8"),
+        "Rekap_Semua_Proyek.csv",
+        "text/csv",
+        on_click="ignore",
     )
-    return fig
-
-
-# --- 3. HELPER: BULK PROCESSOR & SUMMARY ---
-def process_single_location(row_data, phpsess, vo_id, s_date, e_date):
-    loc_id = row_data["LOC_ID"]
-    loc_name = row_data["SITE_NAME"]
-
-    df = fetch_usage_data(phpsess, vo_id, loc_id, s_date, e_date)
-
-    # CASE ERROR: Jika data None (Gagal Fetch)
-    if df is None:
-        return {
-            "status": "error",
-            "name": loc_name,
-            "id": loc_id,
-            "reason": "Connection Failed",
-        }
-
-    # CASE EMPTY: Jika data Kosong (Zonk)
-    if df.empty:
-        return {
-            "status": "empty",
-            "name": loc_name,
-            "id": loc_id,
-            "reason": "No Data Available",
-        }
-
-    # SUKSES FETCH
-    total_usage = df["total_usage_gb"].sum()
-
-    # Buat Chart
-    title_html = f"<b>{loc_name} ({loc_id})</b><br><span style='font-size: 16px; color: gray;'>{s_date.strftime('%d/%m/%Y')} - {e_date.strftime('%d/%m/%Y')}</span>"
-    fig = create_chart(df, title_html)
-    img_bytes = fig.to_image(format="png", width=1400, height=700, scale=2)
-    del fig
-
-    clean_name = "".join([c if c.isalnum() else "_" for c in loc_name])
-    filename = f"{clean_name}_{loc_id}.png"
 
-    return {
-        "status": "success",
-        "filename": filename,
-        "img_data": img_bytes,
-        "loc_id": loc_id,
-        "site_name": loc_name,
-        "total_usage": total_usage,
-    }
 
+# --- 7. IMPORT LOKASI (EXCEL / CSV) ---
+def import_locations(uploaded_file, project_name):
+    # file_uploader tetap memegang file di setiap rerun: proses sekali per file
+    marker = f"imported_{project_name}"
+    if st.session_state.get(marker) == uploaded_file.file_id:
+        return
 
-# --- 4. SECURITY ---
-def check_authentication():
-    if "authenticated" not in st.session_state:
-        st.session_state["authenticated"] = False
-    if not st.session_state["authenticated"]:
-        st.header("🔐 Login Dashboard")
-        with st.form("login_form"):
-            username = st.text_input("Username")
-            password = st.text_input("Password", type="password")
-            if st.form_submit_button("Login"):
-                if username in USERS and USERS[username] == password:
-                    st.session_state["authenticated"] = True
-                    st.session_state["user"] = username
-                    st.rerun()
-                else:
-                    st.error("Login Gagal")
-        return False
-    return True
+    progress = st.sidebar.progress(0.0, text="Membaca file...")
+
+    def on_progress(sheet_name, done, total):
+        if total:
+            text = f"{sheet_name}: {done:,}/{total:,}"
+            progress.progress(min(done / total, 1.0), text=text)
+        else:
+            progress.progress(0.5, text=f"{sheet_name}: {done:,} baris")
+
+    try:
+        result = importer.import_locations(
+            uploaded_file, uploaded_file.name, project_name, DB_NAME, on_progress
+        )
+    except importer.LocationImportError as e:
+        progress.empty()
+        st.sidebar.error(f"Format file salah: {e}")
+        return
+    except Exception as e:
+        progress.empty()
+        st.sidebar.error(f"Error: {e}")
+        return
+
+    st.session_state[marker] = uploaded_file.file_id
+    message = (
+        f"Disimpan! {result['imported']:,} lokasi "
+        f"(+{result['added']} baru, -{result['removed']} dihapus, "
+        f"{result['renamed']} ganti nama)"
+    )
+    if result["duplicates"] or result["invalid"]:
+        message += (
+            f" | {result['duplicates']} LOC_ID dobel & "
+            f"{result['invalid']} baris tanpa LOC_ID dilewati"
+        )
+    if len(result["sheets"]) > 1 or result["skipped_sheets"]:
+        message += f" | Sheet: {', '.join(result['sheets'])}"
+    st.session_state["import_message"] = message
+    st.rerun()
 
 
 # --- MAIN APP ---
 if check_authentication():
+    process_setup = setup_process()
+    metrics_port = process_setup["metrics_port"]
+    warmer_enabled = process_setup["warmer_enabled"]
+
     with st.sidebar:
         st.write(f"👤 User: **{st.session_state['user']}**")
         if st.button("Logout"):
@@ -421,6 +489,9 @@ if check_authentication():
         f"Session ID ({selected_project})", value=default_val, type="password"
     )
     st.session_state["project_sessions"][selected_project] = new_sess
+    if new_sess and new_sess != default_val:
+        # Session terbaru per proyek disimpan, dipakai warmer malam hari
+        save_session(selected_project, new_sess)
 
     # Database Logic
     st.sidebar.markdown("---")
@@ -430,61 +501,68 @@ if check_authentication():
     if not active_df.empty:
         st.sidebar.success(f"✅ {len(active_df)} Lokasi Ready")
         with st.sidebar.expander("⚠️ Atur Data"):
+            # Upload ulang: hanya lokasi baru / hilang / ganti nama yang ditulis
+            uploaded_file = st.file_uploader(
+                "Update dari Excel / CSV",
+                type=["xlsx", "csv"],
+                key=f"reupload_{selected_project}",
+            )
+            if uploaded_file:
+                import_locations(uploaded_file, selected_project)
             if st.button(f"Hapus DB {selected_project}", type="primary"):
                 delete_project_data(selected_project)
                 st.rerun()
     else:
-        st.sidebar.warning("Data kosong. Upload Excel.")
+        st.sidebar.warning("Data kosong. Upload Excel / CSV.")
         uploaded_file = st.sidebar.file_uploader(
-            f"Upload {selected_project}", type=["xlsx"], key=f"file_{selected_project}"
+            f"Upload {selected_project}",
+            type=["xlsx", "csv"],
+            key=f"file_{selected_project}",
         )
         if uploaded_file:
-            try:
-                df_temp = pd.read_excel(uploaded_file)
-                df_temp.columns = [
-                    c.strip().upper().replace(" ", "_") for c in df_temp.columns
-                ]
-                col_loc_id = None
-                col_site_name = None
-                for col in df_temp.columns:
-                    if "LOC" in col:
-                        col_loc_id = col
-                    elif any(x in col for x in ["KEC", "NAM", "LOK", "GED", "SITE"]):
-                        col_site_name = col
-
-                if not col_site_name and len(df_temp.columns) > 1:
-                    col_site_name = (
-                        df_temp.columns[1]
-                        if df_temp.columns[0] == col_loc_id
-                        else df_temp.columns[0]
-                    )
-
-                if col_loc_id and col_site_name:
-                    df_clean = df_temp[[col_loc_id, col_site_name]].copy()
-                    df_clean.columns = ["LOC_ID", "SITE_NAME"]
-                    save_to_db(df_clean, selected_project)
-                    st.sidebar.success("Disimpan!")
-                    st.rerun()
-                else:
-                    st.sidebar.error("Format Excel salah.")
-            except Exception as e:
-                st.sidebar.error(f"Error: {e}")
+            import_locations(uploaded_file, selected_project)
+
+    import_message = st.session_state.pop("import_message", None)
+    if import_message:
+        st.sidebar.success(import_message)
+
+    # Statistik single-flight: berapa request identik yang tidak jadi dikirim
+    flight_stats = usage_flight.stats(top=5)
+    with st.sidebar.expander("📡 Request Coalescing"):
+        st.write(
+            f"Request: **{flight_stats['calls']}** | "
+            f"Dipakai bersama: **{flight_stats['shared']}** | "
+            f"Sedang jalan: **{flight_stats['in_flight']}**"
+        )
+        for key, key_stats in flight_stats["top_keys"]:
+            if key_stats["shared"]:
+                st.caption(f"{key[1]} ({key[2]} - {key[3]}): {key_stats['shared']}x dibagi")
 
     # --- CONTENT AREA ---
     active_sess = st.session_state["project_sessions"].get(selected_project)
 
     if active_df is not None and not active_df.empty:
         st.markdown(f"### 📊 Dashboard: {selected_project}")
-        d_range = st.date_input(
-            "Periode Laporan", value=(datetime(2026, 1, 1), datetime(2026, 1, 31))
-        )
+        col_period, col_gran = st.columns([3, 1])
+        with col_period:
+            d_range = st.date_input(
+                "Periode Laporan", value=(datetime(2026, 1, 1), datetime(2026, 1, 31))
+            )
+        with col_gran:
+            # Dipakai chart Tab 1 & PNG bulk; "Auto" menyesuaikan panjang periode
+            granularity = st.selectbox(
+                "Granularitas",
+                usage_series.GRANULARITIES,
+                format_func=GRANULARITY_LABELS.get,
+            )
 
         # TAB MENU
-        tab1, tab2, tab3 = st.tabs(
+        tab1, tab2, tab3, tab4 = st.tabs(
             [
                 "🔍 Cek Single Location",
                 "📥 Bulk Download (Manager)",
                 "📈 Global Summary (Rekap)",
+                "🛠️ Admin (Metrics)",
             ]
         )
 
@@ -493,21 +571,55 @@ if check_authentication():
             if not active_sess:
                 st.warning("⚠️ Masukkan Session ID di Sidebar.")
             else:
+                # Index lokasi di-cache per proyek; pilihan = LOC_ID (bukan label)
+                # supaya baris terpilih dicari lewat dict, tanpa scan DataFrame
+                loc_index = load_location_index(selected_project)
                 col_sel1, col_sel2 = st.columns([3, 1])
                 with col_sel1:
-                    select_options = active_df.apply(
-                        lambda x: f"{x['SITE_NAME']} | {x['LOC_ID']}", axis=1
+                    query = st.text_input(
+                        "Cari Lokasi (LOC ID / nama):",
+                        key=f"loc_search_{selected_project}",
+                        placeholder="Ketik LOC ID atau nama lokasi...",
+                    )
+                # Key ikut query: ganti kata kunci -> kembali ke halaman 1.
+                # Halaman dibaca dari session_state dulu supaya pencarian cukup
+                # sekali per rerun (page() sekaligus memberi total hasil).
+                page_key = f"loc_page_{selected_project}_{query}"
+                page = st.session_state.get(page_key, 1)
+                page_ids, n_found = loc_index.page(query, page - 1)
+                n_pages = max(1, -(-n_found // PAGE_SIZE))
+                if page > n_pages:
+                    # Daftar lokasi berubah (upload ulang) sejak halaman dipilih
+                    st.session_state[page_key] = page = n_pages
+                    page_ids, _ = loc_index.page(query, page - 1)
+                with col_sel2:
+                    st.number_input(
+                        f"Halaman (dari {n_pages})",
+                        min_value=1,
+                        max_value=n_pages,
+                        value=1,
+                        key=page_key,
+                    )
+                with col_sel1:
+                    selected_loc_id = st.selectbox(
+                        f"Pilih Lokasi ({n_found} ditemukan):",
+                        page_ids,
+                        format_func=loc_index.label,
                     )
-                    selected_option = st.selectbox("Pilih Lokasi:", select_options)
 
-                sel_idx = select_options[select_options == selected_option].index[0]
-                sel_row = active_df.iloc[sel_idx]
+                sel_row = (
+                    loc_index.row(selected_loc_id)
+                    if selected_loc_id is not None
+                    else None
+                )
 
-                if len(d_range) == 2:
+                if sel_row is None:
+                    st.info("Lokasi tidak ditemukan, coba kata kunci lain.")
+                elif len(d_range) == 2:
                     s_date, e_date = d_range
                     if st.button("Tampilkan Grafik", key="btn_single"):
                         with st.spinner("Fetching data..."):
-                            df_res = fetch_usage_data(
+                            series = fetch_usage_series(
                                 active_sess,
                                 current_vo_id,
                                 sel_row["LOC_ID"],
@@ -515,22 +627,24 @@ if check_authentication():
                                 e_date,
                             )
 
-                        if df_res is not None and not df_res.empty:
+                        if series is not None and not series.empty:
                             m1, m2, m3, m4 = st.columns(4)
-                            m1.metric(
-                                "Total Usage",
-                                f"{df_res['total_usage_gb'].sum():.2f} GB",
-                            )
+                            m1.metric("Total Usage", f"{series.total_usage_gb:.2f} GB")
                             m2.metric(
-                                "Rata-rata/Hari",
-                                f"{df_res['total_usage_gb'].mean():.2f} GB",
+                                "Rata-rata/Hari", f"{series.mean_usage_gb:.2f} GB"
                             )
-                            m3.metric("Max User", f"{df_res['connected_user'].max()}")
-                            m4.metric("Data Point", f"{len(df_res)} Hari")
+                            m3.metric("Max User", f"{series.max_users}")
+                            m4.metric("Data Point", f"{len(series)} Hari")
 
+                            chart_gran = usage_series.resolve_granularity(
+                                granularity, s_date, e_date
+                            )
+                            with metrics.timed("frame"):
+                                df_res = series.resample(chart_gran).to_frame()
                             title_html = f"<b>{sel_row['SITE_NAME']} ({sel_row['LOC_ID']})</b><br><span style='font-size: 16px; color: gray;'>{s_date.strftime('%d/%m/%Y')} - {e_date.strftime('%d/%m/%Y')}</span>"
                             st.plotly_chart(
-                                create_chart(df_res, title_html), width="stretch"
+                                create_chart(df_res, title_html, chart_gran),
+                                width="stretch",
                             )
                         else:
                             st.error("Data kosong atau session invalid.")
@@ -543,10 +657,67 @@ if check_authentication():
 
             mode = st.radio(
                 "Kecepatan Download:",
-                ["Safe Mode (Stabil)", "Turbo Mode (Cepat)"],
+                list(CONCURRENCY_MODES.keys()),
                 horizontal=True,
             )
-            workers = 3 if "Safe" in mode else 8
+            # HTML: satu file berisi ringkasan + chart interaktif, tanpa render PNG
+            output_format = st.radio(
+                "Format Hasil:",
+                list(BULK_FORMATS.keys()),
+                horizontal=True,
+            )
+            bulk_format = BULK_FORMATS[output_format]
+
+            # Hasil CLI terjadwal (cron malam) tinggal didownload, tanpa fetch ulang
+            artifacts = reports.list_artifacts(selected_project)
+            if artifacts:
+                with st.expander(f"📦 Laporan Terjadwal ({len(artifacts)} file)"):
+                    for path in artifacts:
+                        name = os.path.basename(path)
+                        st.download_button(
+                            f"💾 {name}",
+                            lambda path=path: reports.read_report(path),
+                            name,
+                            key=f"artifact_{name}",
+                            on_click="ignore",
+                        )
+
+            bulk_job = get_session_job("bulk", selected_project)
+
+            # Checkpoint job sebelumnya (periode & proyek sama) -> dilanjutkan
+            fresh_run = False
+            if (
+                bulk_format == ".zip"
+                and len(d_range) == 2
+                and not (bulk_job and bulk_job.active)
+            ):
+                prev_job = jobs.find_job(
+                    DB_NAME,
+                    selected_project,
+                    current_vo_id,
+                    *d_range,
+                    usage_series.resolve_granularity(granularity, *d_range),
+                )
+                if prev_job and prev_job["status"] != "done":
+                    counts = prev_job["counts"]
+                    st.warning(
+                        f"🔁 Job sebelumnya ({prev_job['updated_at']}) belum tuntas: "
+                        f"{counts.get('success', 0)} sukses, "
+                        f"{sum(counts.values()) - counts.get('success', 0)} gagal/pending. "
+                        "Klik Mulai untuk melanjutkan (yang sudah sukses tidak diulang)."
+                    )
+                    if not jobs.settled(d_range[1]):
+                        st.caption(
+                            "Data periode ini belum final: chart yang dibuat lebih dari "
+                            f"{jobs.RESUME_HOURS} jam lalu tetap dibuat ulang."
+                        )
+                elif prev_job:
+                    st.caption(
+                        f"Job periode ini sudah selesai ({prev_job['updated_at']}); "
+                        "Mulai akan membuat ulang semua chart."
+                    )
+                # Selalu ada, misalnya kalau chart lama dicurigai salah
+                fresh_run = st.checkbox("Mulai dari awal (hapus checkpoint)")
 
             if len(d_range) == 2 and st.button(
                 f"Mulai Download ({len(active_df)} Lokasi)", key="btn_bulk"
@@ -556,71 +727,81 @@ if check_authentication():
                     st.stop()
 
                 s_date, e_date = d_range
-                zip_buffer = io.BytesIO()
-                prog_bar = st.progress(0)
-                status_text = st.empty()
-
-                # List untuk menampung error log
-                error_logs = []
-                success_count = 0
-
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=workers
-                ) as executor:
-                    futures = {
-                        executor.submit(
-                            process_single_location,
-                            row,
-                            active_sess,
-                            current_vo_id,
-                            s_date,
-                            e_date,
-                        ): row
-                        for _, row in active_df.iterrows()
-                    }
-
-                    total = len(active_df)
-                    with zipfile.ZipFile(
-                        zip_buffer, "a", zipfile.ZIP_DEFLATED, False
-                    ) as zf:
-                        for i, future in enumerate(
-                            concurrent.futures.as_completed(futures)
-                        ):
-                            res = future.result()
-                            prog_bar.progress((i + 1) / total)
-                            status_text.text(f"Processing {i + 1}/{total}...")
-
-                            if res["status"] == "success":
-                                zf.writestr(res["filename"], res["img_data"])
-                                success_count += 1
-                            else:
-                                # Catat Error
-                                error_logs.append(
-                                    f"[{res['status'].upper()}] {res['name']} ({res['id']}): {res['reason']}"
-                                )
-
-                        # Tulis File Log Error ke dalam ZIP
-                        if error_logs:
-                            log_content = (
-                                f"LAPORAN ERROR DOWNLOAD\nProject: {selected_project}\nTanggal: {datetime.now()}\n\n"
-                                + "\n".join(error_logs)
-                            )
-                            zf.writestr("00_LAPORAN_ERROR_LOG.txt", log_content)
-
-                status_text.success(
-                    f"✅ Selesai! Berhasil: {success_count}, Gagal/Kosong: {len(error_logs)}"
+                bulk_gran = usage_series.resolve_granularity(granularity, s_date, e_date)
+                job_kwargs = {"controller": make_controller(mode), "granularity": bulk_gran}
+                if bulk_format == ".zip":
+                    job_fn = reports.bulk_report_job
+                    job_kwargs["fresh"] = fresh_run
+                else:
+                    job_fn = reports.html_report_job
+                # Jalan di background; request identik yang sedang jalan dipakai bersama
+                bulk_job = background.get_executor().submit(
+                    "bulk",
+                    background.job_key(
+                        "bulk",
+                        current_vo_id,
+                        active_df["LOC_ID"],
+                        s_date,
+                        e_date,
+                        extra=f"{selected_project}|{bulk_gran}|{bulk_format}",
+                    ),
+                    job_label(selected_project, s_date, e_date),
+                    job_fn,
+                    DB_NAME,
+                    selected_project,
+                    active_sess,
+                    current_vo_id,
+                    active_df,
+                    s_date,
+                    e_date,
+                    **job_kwargs,
                 )
-                if error_logs:
+                set_session_job("bulk", selected_project, bulk_job)
+                if fresh_run and bulk_job.attached:
+                    # Job identik (checkpoint yang sama) sudah jalan: tidak bisa
+                    # dihapus di tengah jalan, jadi request ini ikut job itu
                     st.warning(
-                        f"⚠️ Ada {len(error_logs)} lokasi yang gagal/kosong. Cek file '00_LAPORAN_ERROR_LOG.txt' di dalam ZIP."
+                        "⚠️ Job yang sama sedang berjalan, jadi 'Mulai dari awal' "
+                        "tidak diterapkan. Setelah job ini selesai, centang lagi untuk "
+                        "membuat ulang semua chart."
                     )
 
-                st.download_button(
-                    "💾 Download ZIP Hasil",
-                    zip_buffer.getvalue(),
-                    f"Report_{selected_project}.zip",
-                    "application/zip",
-                )
+            if bulk_job:
+                st.caption(f"Job: {bulk_job.label}")
+                if bulk_job.active:
+                    poll_job(bulk_job.job_id)
+                elif bulk_job.status == background.FAILED:
+                    st.error(f"Job gagal: {bulk_job.error}")
+                else:
+                    result = bulk_job.result
+                    success_count = result["success_count"]
+                    error_logs = result["error_logs"]
+                    report_path = bulk_job.artifact_path
+                    suffix = os.path.splitext(report_path)[1]
+                    is_html = suffix == ".html"
+
+                    st.success(
+                        f"✅ Selesai! Berhasil: {success_count}, Gagal/Kosong: {len(error_logs)}"
+                    )
+                    if error_logs:
+                        where = (
+                            "bagian 'Gagal / Kosong' di laporan HTML"
+                            if is_html
+                            else f"file '{reports.ERROR_LOG_NAME}' di dalam ZIP"
+                        )
+                        st.warning(
+                            f"⚠️ Ada {len(error_logs)} lokasi yang gagal/kosong. Cek {where}."
+                        )
+                        st.caption(reports.format_failures(result["failures"]))
+
+                    # Dibaca dari disk hanya saat tombol diklik (deferred)
+                    st.download_button(
+                        "💾 Download HTML Hasil" if is_html else "💾 Download ZIP Hasil",
+                        lambda: reports.read_report(report_path),
+                        f"Report_{selected_project}{suffix}",
+                        "text/html" if is_html else "application/zip",
+                        on_click="ignore",
+                    )
 
         # === TAB 3: GLOBAL SUMMARY (NEW FEATURE!) ===
         with tab3:
@@ -629,68 +810,56 @@ if check_authentication():
                 "Fitur ini akan menarik data sekilas dari seluruh lokasi untuk membuat peringkat penggunaan."
             )
 
+            summary_job = get_session_job("summary", selected_project)
+
             if st.button("Generate Summary Report"):
                 if not active_sess:
                     st.error("Session ID Kosong!")
                     st.stop()
 
                 s_date, e_date = d_range
-                summary_data = []
-                prog_bar = st.progress(0)
-
-                # Gunakan Turbo Mode untuk fetch data (Tanpa generate gambar biar cepat)
-                with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                    futures = {
-                        executor.submit(
-                            fetch_usage_data,
-                            active_sess,
-                            current_vo_id,
-                            row["LOC_ID"],
-                            s_date,
-                            e_date,
-                        ): row
-                        for _, row in active_df.iterrows()
-                    }
-
-                    for i, future in enumerate(
-                        concurrent.futures.as_completed(futures)
-                    ):
-                        row = futures[future]
-                        df_res = future.result()
-                        prog_bar.progress((i + 1) / len(active_df))
-
-                        if df_res is not None and not df_res.empty:
-                            total_gb = df_res["total_usage_gb"].sum()
-                            avg_gb = df_res["total_usage_gb"].mean()
-                            summary_data.append(
-                                {
-                                    "Kecamatan/Lokasi": row["SITE_NAME"],
-                                    "LOC ID": row["LOC_ID"],
-                                    "Total Usage (GB)": round(total_gb, 2),
-                                    "Rata-rata (GB)": round(avg_gb, 2),
-                                }
-                            )
-
-                if summary_data:
-                    df_summary = pd.DataFrame(summary_data).sort_values(
-                        "Total Usage (GB)", ascending=False
-                    )
+                # Fetch data saja (Tanpa generate gambar biar cepat), concurrency Auto
+                summary_job = background.get_executor().submit(
+                    "summary",
+                    background.job_key(
+                        "summary", current_vo_id, active_df["LOC_ID"], s_date, e_date
+                    ),
+                    job_label(selected_project, s_date, e_date),
+                    reports.summary_report_job,
+                    DB_NAME,
+                    active_sess,
+                    current_vo_id,
+                    active_df,
+                    s_date,
+                    e_date,
+                    controller=make_controller("Auto (Adaptif)"),
+                )
+                set_session_job("summary", selected_project, summary_job)
+
+            if summary_job:
+                st.caption(f"Job: {summary_job.label}")
+                if summary_job.active:
+                    poll_job(summary_job.job_id)
+                elif summary_job.status == background.FAILED:
+                    st.error(f"Job gagal: {summary_job.error}")
+                elif not summary_job.result.empty:
+                    df_summary = summary_job.result
+                    failures = df_summary.attrs.get("failures")
+                    if failures:
+                        st.caption(
+                            f"Tidak masuk rekap: {reports.format_failures(failures)}"
+                        )
 
                     # Tampilkan Metric Global
-                    col1, col2 = st.columns(2)
-                    col1.metric(
-                        "Total Usage Project",
-                        f"{df_summary['Total Usage (GB)'].sum():,.2f} GB",
-                    )
-                    col2.metric(
-                        "Lokasi Aktif", f"{len(df_summary)} / {len(active_df)} Titik"
-                    )
+                    summary_metrics(df_summary, summary_job.total)
 
                     st.markdown("---")
 
                     # Tampilkan Bar Chart Top 10
                     st.subheader("🏆 Top 10 Lokasi dengan Usage Tertinggi")
-                    df_top10 = df_summary.head(10)
+                    df_top10 = summary.top_n(df_summary, 10)
+                    import plotly.express as px  # Hanya dibutuhkan di Tab 3
+
                     fig_bar = px.bar(
                         df_top10,
                         x="Total Usage (GB)",
@@ -709,4 +878,87 @@ if check_authentication():
                     st.subheader("📋 Data Lengkap")
                     st.dataframe(df_summary, use_container_width=True)
                 else:
-                    st.error("Gagal mengambil data rekap. Pastikan Session ID Valid.")
+                    failures = summary_job.result.attrs.get("failures")
+                    st.error(
+                        "Gagal mengambil data rekap. "
+                        + (reports.format_failures(failures) if failures else "")
+                    )
+
+            st.markdown("---")
+            all_projects_summary_section(d_range)
+
+        # === TAB 4: ADMIN / METRICS ===
+        with tab4:
+            st.markdown("### 🛠️ Metrics Pipeline")
+            if metrics_port:
+                st.caption(f"Format Prometheus: `http://<host>:{metrics_port}/metrics`")
+            else:
+                st.caption("Endpoint Prometheus mati (METRICS_PORT=0 atau port bentrok).")
+
+            registry = metrics.registry
+            http_total = sum(
+                c["value"]
+                for c in registry.counters()
+                if c["name"] == "http_requests_total"
+            )
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Request wifi.id", f"{http_total:,}")
+            col2.metric("Retry", f"{registry.counter_value('http_retries_total'):,}")
+            col3.metric(
+                "Data Diterima",
+                f"{registry.counter_value('http_bytes_total') / 1024**2:,.1f} MB",
+            )
+
+            # Hit rate per layer cache (RAM usage_cache & usage_store SQLite per hari)
+            cache_cols = st.columns(3)
+            cache_layers = [
+                ("memory", "Cache RAM (usage)"),
+                ("usage_store", "Usage Store (hari)"),
+            ]
+            for col, (cache, label) in zip(cache_cols, cache_layers):
+                lookups = registry.counter_value("cache_requests_total", cache=cache)
+                misses = registry.counter_value("cache_misses_total", cache=cache)
+                hit_rate = (lookups - misses) / lookups * 100 if lookups else 0.0
+                col.metric(label, f"{hit_rate:.1f}% hit", f"{lookups:,} lookup", "off")
+            cache_stats = usage_cache.stats()
+            cache_cols[2].metric(
+                "Memori Cache",
+                f"{cache_stats['bytes'] / 1024**2:,.1f} / "
+                f"{cache_stats['max_bytes'] / 1024**2:,.0f} MB",
+                f"{cache_stats['entries']:,} entry, {cache_stats['evictions']:,} evicted",
+                "off",
+            )
+
+            if warmer_enabled:
+                last_warm = warmer.last_run
+                st.caption(
+                    f"🌙 Warmer jalan tiap jam {warmer.WARM_HOUR:02d}:00. "
+                    + (
+                        f"Terakhir {last_warm['finished_at']:%d/%m %H:%M}: "
+                        + "; ".join(warmer.format_results(last_warm["results"]))
+                        if last_warm
+                        else "Belum pernah jalan sejak server start."
+                    )
+                )
+
+            st.subheader("⏱️ Latency per Tahap")
+            stage_rows = registry.stage_stats()
+            if stage_rows:
+                st.dataframe(pd.DataFrame(stage_rows), width="stretch")
+            else:
+                st.info("Belum ada data. Jalankan fetch / bulk / summary dulu.")
+
+            with st.expander("Semua Counter"):
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {**c["labels"], "name": c["name"], "value": c["value"]}
+                            for c in registry.counters()
+                        ]
+                    ),
+                    width="stretch",
+                )
+
+            if st.button("Reset Metrics"):
+                registry.reset()
+                st.rerun()
@@ -0,0 +1,126 @@
+import hashlib
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# --- BACKGROUND JOB EXECUTOR ---
+# Bulk & summary jalan di luar script run Streamlit (thread pool per proses),
+# jadi rerun / tab browser tertutup tidak membatalkan kerjaan. Job identik
+# (jenis, vo_id, set lokasi, periode sama) yang masih jalan dipakai bersama:
+# user kedua cukup "menempel" ke job yang sudah ada. UI tinggal polling status.
+
+JOB_WORKERS = 2
+JOB_TTL = 6 * 3600  # Job selesai disimpan 6 jam supaya hasilnya bisa diambil
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def job_key(kind, vo_id, loc_ids, start_date, end_date, extra=""):
+    locs = ",".join(sorted(str(loc_id) for loc_id in loc_ids))
+    raw = f"{kind}|{vo_id}|{start_date.isoformat()}|{end_date.isoformat()}|{extra}|{locs}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class BackgroundJob:
+    def __init__(self, job_id, kind, key, label):
+        self.job_id = job_id
+        self.kind = kind
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.controller = None
+        self.result = None
+        self.partial = None  # Hasil sementara (summary), diganti utuh tiap snapshot
+        self.artifact_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.attached = 0  # berapa kali request identik menempel ke job ini
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    def set_progress(self, done, total):
+        self.done = done
+        self.total = total
+
+    def set_partial(self, result):
+        self.partial = result
+
+
+class JobExecutor:
+    def __init__(self, max_workers=JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="report-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active_by_key = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, kind, key, label, fn, *args, **kwargs):
+        # fn(job, *args, **kwargs) -> result; boleh mengisi job.artifact_path
+        with self._lock:
+            self._cleanup()
+            job_id = self._active_by_key.get(key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                job.attached += 1
+                return job
+
+            job = BackgroundJob(f"{kind}-{next(self._ids)}", kind, key, label)
+            self._jobs[job.job_id] = job
+            self._active_by_key[key] = job.job_id
+
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            traceback.print_exc()
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active_by_key.get(job.key) == job.job_id:
+                    del self._active_by_key[job.key]
+
+    def _cleanup(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and now - job.finished_at > JOB_TTL:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    # Satu executor per proses server, dipakai bersama semua session browser
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
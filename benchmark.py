@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# --- BENCHMARK END-TO-END (OFFLINE) ---
+# Mengukur fetch / summary / bulk terhadap mock_server.py (bukan wifi.id
+# produksi): throughput, latency request p50/p95/p99, dan peak RSS.
+# Setiap skenario jalan di subprocess sendiri supaya peak RSS tidak tercampur.
+# Skenario "startup" mengukur cold start dashboard (import streamlit, halaman
+# login pertama, render dashboard pertama setelah login, rerun) lewat AppTest.
+#
+# Contoh:
+#   python benchmark.py
+#   python benchmark.py --scenarios summary-100 bulk-100 --latency 0.5 --error-rate 0.05
+#   python benchmark.py --scenarios startup
+
+SCENARIOS = {
+    "startup": ("startup", 0),
+    "single": ("single", 1),
+    "summary-100": ("summary", 100),
+    "bulk-100": ("bulk", 100),
+    "html-100": ("html", 100),
+    "summary-2000": ("summary", 2000),
+    "bulk-2000": ("bulk", 2000),
+}
+BENCH_VO_ID = "99999"
+BENCH_PROJECT = "Benchmark"
+STARTUP_TYPING_SECONDS = 3  # Jeda login: user mengetik username & password
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss di Linux dalam KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _seed_locations(db_path, count):
+    import pandas as pd
+
+    from database import init_db, save_to_db
+
+    init_db(db_path)
+    locations = pd.DataFrame(
+        {
+            "LOC_ID": [f"BENCH{i:05d}" for i in range(count)],
+            "SITE_NAME": [f"Lokasi Benchmark {i}" for i in range(count)],
+        }
+    )
+    save_to_db(locations, BENCH_PROJECT, db_path)
+    return locations
+
+
+def run_startup(scenario):
+    # Proses baru = cold start. Metrics server & warmer dimatikan supaya tidak
+    # bentrok dengan dashboard yang mungkin sedang jalan di mesin yang sama.
+    workdir = tempfile.mkdtemp(prefix="wifi_bench_")
+    os.chdir(workdir)
+    os.environ.update(
+        METRICS_PORT="0",
+        WARM_HOUR="-1",
+        WIFI_DB_PATH=os.path.join(workdir, "bench.db"),
+    )
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    import_seconds = time.perf_counter() - started
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.secrets["users"] = {"bench": "bench"}
+    t0 = time.perf_counter()
+    at.run()
+    login_seconds = time.perf_counter() - t0
+
+    time.sleep(STARTUP_TYPING_SECONDS)
+    at.text_input[0].input("bench")
+    at.text_input[1].input("bench")
+    at.button[0].click()
+    t0 = time.perf_counter()
+    at.run()
+    dashboard_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    at.run()
+    rerun_seconds = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    return {
+        "scenario": scenario,
+        "import_seconds": round(import_seconds, 3),
+        "login_seconds": round(login_seconds, 3),
+        "dashboard_seconds": round(dashboard_seconds, 3),
+        "rerun_seconds": round(rerun_seconds, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_child(scenario, days, concurrency):
+    # Dijalankan di subprocess: WIFI_API_URL sudah diarahkan ke mock
+    kind, count = SCENARIOS[scenario]
+    if kind == "startup":
+        return run_startup(scenario)
+
+    import reports
+    import usage_store
+    import wifi_api
+    from concurrency import AimdController
+
+    workdir = tempfile.mkdtemp(prefix="wifi_bench_")
+    os.chdir(workdir)  # jobs/ & file hasil ditulis di folder sementara
+    db_path = os.path.join(workdir, "bench.db")
+    locations = _seed_locations(db_path, count)
+    end_date = date(2026, 1, 1) + timedelta(days=days - 1)
+    start_date = date(2026, 1, 1)
+
+    latencies = []
+
+    class RecordingController(AimdController):
+        def on_result(self, latency, ok):
+            latencies.append(latency)
+            super().on_result(latency, ok)
+
+    if concurrency == "auto":
+        controller = RecordingController()
+    else:
+        controller = RecordingController.fixed(int(concurrency))
+
+    ok = failed = 0
+    started = time.perf_counter()
+    if kind == "single":
+        # Jalur Tab 1: fetch sync + store + chart
+        http = wifi_api.create_http_session()
+        row = locations.iloc[0]
+        t0 = time.perf_counter()
+        df = usage_store.fetch_with_store(
+            db_path,
+            lambda s, e: wifi_api.fetch_daily_records(
+                http, "bench", BENCH_VO_ID, row["LOC_ID"], s, e
+            ),
+            BENCH_VO_ID,
+            row["LOC_ID"],
+            start_date,
+            end_date,
+        )
+        latencies.append(time.perf_counter() - t0)
+        res = reports.process_single_location(row, df, start_date, end_date)
+        ok, failed = (1, 0) if res["status"] == "success" else (0, 1)
+    elif kind == "summary":
+        df_summary = reports.run_summary_report(
+            db_path,
+            "bench",
+            BENCH_VO_ID,
+            locations,
+            start_date,
+            end_date,
+            controller=controller,
+        )
+        ok = len(df_summary)
+        failed = count - ok
+    else:
+        run = reports.run_html_report if kind == "html" else reports.run_bulk_report
+        result = run(
+            db_path,
+            BENCH_PROJECT,
+            "bench",
+            BENCH_VO_ID,
+            locations,
+            start_date,
+            end_date,
+            os.path.join(workdir, f"bench.{'html' if kind == 'html' else 'zip'}"),
+            controller=controller,
+        )
+        ok = result["success_count"]
+        failed = len(result["error_logs"])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": scenario,
+        "locations": count,
+        "seconds": round(elapsed, 3),
+        "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+        "requests": len(latencies),
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "p99": round(percentile(latencies, 99), 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "ok": ok,
+        "failed": failed,
+    }
+
+
+def print_table(results):
+    header = (
+        f"{'scenario':<14}{'locs':>6}{'sec':>9}{'loc/s':>9}{'req':>7}"
+        f"{'p50':>8}{'p95':>8}{'p99':>8}{'RSS MB':>9}{'ok':>6}{'fail':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "error" in r:
+            print(f"{r['scenario']:<14} ERROR: {r['error']}")
+            continue
+        if "login_seconds" in r:
+            print(
+                f"{r['scenario']:<14}import streamlit {r['import_seconds']:.2f}s, "
+                f"login {r['login_seconds']:.2f}s, dashboard {r['dashboard_seconds']:.2f}s, "
+                f"rerun {r['rerun_seconds']:.2f}s, RSS {r['peak_rss_mb']:.1f} MB"
+            )
+            continue
+        print(
+            f"{r['scenario']:<14}{r['locations']:>6}{r['seconds']:>9.2f}{r['throughput']:>9.1f}"
+            f"{r['requests']:>7}{r['p50']:>8.3f}{r['p95']:>8.3f}{r['p99']:>8.3f}"
+            f"{r['peak_rss_mb']:>9.1f}{r['ok']:>6}{r['failed']:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline vs mock wifi.id")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS)
+    )
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--concurrency", default="auto")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-length", type=float, default=0.0)
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.days, args.concurrency)))
+        return 0
+
+    # Tidak di-import di child: aiohttp dkk ikut terhitung di skenario startup
+    import mock_server
+
+    url = mock_server.start_in_thread(
+        mock_server.MockConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            burst_every=args.burst_every,
+            burst_length=args.burst_length,
+            seed=1,
+        )
+    )
+    env = dict(os.environ, WIFI_API_URL=url)
+    here = os.path.dirname(os.path.abspath(__file__))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [here, env.get("PYTHONPATH")]))
+
+    results = []
+    for scenario in args.scenarios:
+        print(f"... {scenario}", file=sys.stderr, flush=True)
+        proc = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--child",
+                scenario,
+                "--days",
+                str(args.days),
+                "--concurrency",
+                args.concurrency,
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        try:
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        except (IndexError, ValueError):
+            tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+            results.append({"scenario": scenario, "error": tail})
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import threading
+
+import metrics
+from usage_series import DAILY, MONTHLY, WEEKLY
+
+# Label sumbu X & nama trace user per granularitas (lihat usage_series)
+DATE_FORMATS = {DAILY: "%d %b", WEEKLY: "Mg %d %b", MONTHLY: "%b %Y"}
+USER_LABELS = {
+    DAILY: "Connected User",
+    WEEKLY: "Connected User (rata-rata/hari)",
+    MONTHLY: "Connected User (rata-rata/hari)",
+}
+
+
+# --- FUNGSI CHART ---
+def _build_template(granularity):
+    # Figure lengkap (2 trace, dual y-axis, legend, template) tanpa data.
+    # Validasi plotly cukup terjadi di sini, sekali per granularitas.
+    import plotly.graph_objects as go  # Berat, baru di-import saat chart pertama
+
+    user_label = USER_LABELS[granularity]
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            name=user_label,
+            mode="lines+markers",
+            line=dict(color="#2980b9", width=5, shape="spline"),
+            marker=dict(size=8),
+            yaxis="y",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            name="Total Usage (GB)",
+            mode="lines+markers",
+            line=dict(color="#c0392b", width=5, shape="spline"),
+            marker=dict(size=8),
+            yaxis="y2",
+        )
+    )
+    fig.update_layout(
+        title=dict(
+            font=dict(size=22, color="black"),
+            y=0.95,
+            x=0.01,
+            xanchor="left",
+            yanchor="top",
+        ),
+        margin=dict(l=50, r=50, t=150, b=50),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="left",
+            x=0,
+            font=dict(size=14),
+        ),
+        xaxis=dict(
+            type="category", showgrid=False, tickangle=-45, tickfont=dict(size=12)
+        ),
+        yaxis=dict(
+            title=dict(text=user_label, font=dict(color="#2980b9", size=14)),
+            tickfont=dict(color="#2980b9", size=12),
+        ),
+        yaxis2=dict(
+            title=dict(text="Total Usage (GB)", font=dict(color="#c0392b", size=14)),
+            tickfont=dict(color="#c0392b", size=12),
+            overlaying="y",
+            side="right",
+            showgrid=False,
+        ),
+        template="plotly_white",
+        hovermode="x unified",
+    )
+    return fig.to_dict()
+
+
+class ChartFactory:
+    # Layout & style trace dibangun + divalidasi sekali; per lokasi hanya
+    # array x/y dan judul yang diganti. Hasilnya spec dict (siap dikirim ke
+    # render pool / st.plotly_chart). Bagian yang tidak diganti dipakai
+    # bersama antar spec: jangan diubah in-place.
+    def __init__(self, granularity=DAILY):
+        self.granularity = granularity
+        self.date_format = DATE_FORMATS[granularity]
+        template = _build_template(granularity)
+        self._traces = template["data"]
+        self._layout = template["layout"]
+
+    @metrics.timed("chart")
+    def spec(self, df, title_text):
+        # df: [date, connected_user, total_usage_gb]; df tidak diubah
+        x = df["date"].dt.strftime(self.date_format).tolist()
+        user_trace, usage_trace = self._traces
+        layout = dict(self._layout)
+        layout["title"] = dict(layout["title"], text=title_text)
+        return {
+            "data": [
+                dict(user_trace, x=x, y=df["connected_user"].to_numpy()),
+                dict(usage_trace, x=x, y=df["total_usage_gb"].to_numpy()),
+            ],
+            "layout": layout,
+        }
+
+
+_factories = {}
+_factories_lock = threading.Lock()
+
+
+def get_chart_factory(granularity=DAILY):
+    # Satu factory per granularitas per proses, dipakai bersama Tab 1 & bulk
+    with _factories_lock:
+        factory = _factories.get(granularity)
+        if factory is None:
+            factory = _factories[granularity] = ChartFactory(granularity)
+        return factory
+
+
+def create_chart(df, title_text, granularity=DAILY):
+    # -> spec figure (dict); lihat ChartFactory
+    return get_chart_factory(granularity).spec(df, title_text)
@@ -0,0 +1,308 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import metrics
+import reports
+import usage_series
+import warmer
+import wifi_api
+from concurrency import AimdController, format_stats
+from config import DB_NAME, PROJECT_CONFIG
+from database import init_db, load_from_db
+
+# --- CLI BATCH (TANPA STREAMLIT) ---
+# Menjalankan pipeline Bulk Download / Global Summary dari terminal atau cron,
+# supaya laporan berat bisa dibuat malam hari. Hasil disimpan di folder
+# reports/ dan bisa langsung didownload dari dashboard (Tab 2).
+#
+# Contoh:
+#   WIFI_SESSION_ID=xxxx python cli.py bulk --project "Pendidikan" \
+#       --start 2026-01-01 --end 2026-01-31 --concurrency auto
+#   python cli.py bulk --project "Pendidikan" --start 2026-01-01 \
+#       --end 2026-12-31 --format html --session-id xxxx
+#   python cli.py summary --project "Pendidikan" --start 2026-01-01 \
+#       --end 2026-01-31 --session-id xxxx --output rekap.csv
+#   python cli.py summary --project all --start 2026-01-01 --end 2026-01-31
+#   python cli.py warm   # jam 2 pagi: data kemarin semua proyek ke cache
+
+ALL_PROJECTS = "all"
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Format tanggal harus YYYY-MM-DD: {value}")
+
+
+def parse_concurrency(value):
+    if value == "auto":
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Concurrency harus 'auto' atau angka")
+    if limit < 1:
+        raise argparse.ArgumentTypeError("Concurrency minimal 1")
+    return limit
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate laporan Wifi.id (bulk ZIP/HTML / summary) tanpa Streamlit."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [
+        ("bulk", "Download chart semua lokasi ke ZIP / HTML (+ log error)"),
+        ("summary", "Rekap total & rata-rata usage per lokasi ke CSV"),
+    ]:
+        sub = subparsers.add_parser(name, help=help_text)
+        project_choices = list(PROJECT_CONFIG.keys())
+        if name == "summary":
+            # Rekap semua proyek sekaligus (satu run fetch, lokasi bersama sekali)
+            project_choices.append(ALL_PROJECTS)
+        sub.add_argument("--project", required=True, choices=project_choices)
+        sub.add_argument("--start", required=True, type=parse_date)
+        sub.add_argument("--end", required=True, type=parse_date)
+        sub.add_argument(
+            "--session-id",
+            default=os.environ.get("WIFI_SESSION_ID"),
+            help="PHPSESSID wifi.id (default: env WIFI_SESSION_ID)",
+        )
+        sub.add_argument(
+            "--concurrency",
+            default="auto",
+            type=parse_concurrency,
+            help="'auto' (AIMD) atau jumlah request paralel tetap",
+        )
+        sub.add_argument("--db", default=DB_NAME)
+        sub.add_argument(
+            "--output", help="Path file hasil (default: folder reports/)"
+        )
+        sub.add_argument(
+            "--metrics-file",
+            help="Tulis metrics (format Prometheus textfile) ke path ini setelah selesai",
+        )
+        if name == "bulk":
+            sub.add_argument(
+                "--fresh",
+                action="store_true",
+                help="Abaikan checkpoint job sebelumnya, proses ulang semua lokasi",
+            )
+            sub.add_argument(
+                "--granularity",
+                default=usage_series.AUTO,
+                choices=usage_series.GRANULARITIES,
+                help="Titik chart harian / mingguan / bulanan (auto: sesuai periode)",
+            )
+            sub.add_argument(
+                "--format",
+                default="zip",
+                choices=["zip", "html"],
+                help="zip: PNG per lokasi; html: satu file ringkasan + chart interaktif",
+            )
+
+    # Warmer: tanpa --project/--start/--end, session dari tabel project_sessions
+    warm = subparsers.add_parser(
+        "warm", help="Pre-fetch data kemarin semua proyek ke cache (cron malam)"
+    )
+    warm.add_argument("--day", type=parse_date, help="Default: kemarin")
+    warm.add_argument(
+        "--session-id",
+        help="Pakai session ini untuk semua proyek (default: session tersimpan)",
+    )
+    warm.add_argument(
+        "--concurrency",
+        default=warmer.WARM_CONCURRENCY,
+        type=parse_concurrency,
+        help=f"Request paralel (default {warmer.WARM_CONCURRENCY}, sengaja rendah)",
+    )
+    warm.add_argument("--db", default=DB_NAME)
+    warm.add_argument(
+        "--metrics-file",
+        help="Tulis metrics (format Prometheus textfile) ke path ini setelah selesai",
+    )
+
+    return parser
+
+
+def print_progress(controller):
+    def on_progress(done, total):
+        if done == total or done % 10 == 0:
+            print(
+                f"\r[{done}/{total}] {format_stats(controller)}",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    return on_progress
+
+
+def make_controller(concurrency):
+    if concurrency is None:
+        return AimdController()
+    return AimdController.fixed(concurrency)
+
+
+def run_all_projects(args):
+    controller = make_controller(args.concurrency)
+    output = args.output or reports.artifact_path(
+        "Semua Proyek", args.start, args.end, "summary", ".csv"
+    )
+    result = reports.run_all_projects_summary(
+        args.db,
+        {project_name: args.session_id for project_name in PROJECT_CONFIG},
+        args.start,
+        args.end,
+        controller=controller,
+        on_progress=print_progress(controller),
+    )
+    print(file=sys.stderr)
+    for project_name, reason in result["invalid_sessions"].items():
+        print(f"Dilewati ({reason}): {project_name}", file=sys.stderr)
+    if result["failures"]:
+        print(
+            f"Tidak masuk rekap: {reports.format_failures(result['failures'])}",
+            file=sys.stderr,
+        )
+    if result["summary"].empty:
+        print("Gagal mengambil data rekap. Pastikan Session ID Valid.", file=sys.stderr)
+        return 1
+
+    result["summary"].to_csv(output, index=False)
+    print(result["subtotals"].to_string(index=False))
+    print(
+        f"Selesai! {result['unique_locations']} lokasi unik "
+        f"({result['shared_locations']} dipakai bersama), "
+        f"total {result['total_usage_gb']:,.2f} GB -> {output}"
+    )
+    if args.metrics_file:
+        metrics.write_textfile(args.metrics_file)
+    return 0
+
+
+def run_warm(args):
+    sessions = None
+    if args.session_id:
+        sessions = {project_name: args.session_id for project_name in PROJECT_CONFIG}
+    results = warmer.warm(
+        args.db,
+        day=args.day,
+        concurrency=args.concurrency or warmer.WARM_CONCURRENCY,
+        sessions=sessions,
+    )
+    for line in warmer.format_results(results):
+        print(line)
+    if args.metrics_file:
+        metrics.write_textfile(args.metrics_file)
+    return 0 if any(result["ok"] for result in results.values()) else 1
+
+
+def run_project(args, locations, vo_id, controller):
+    if args.command == "bulk":
+        output = args.output or reports.artifact_path(
+            args.project, args.start, args.end, "bulk", f".{args.format}"
+        )
+        kwargs = {
+            "controller": controller,
+            "on_progress": print_progress(controller),
+            "granularity": args.granularity,
+        }
+        if args.format == "html":
+            run = reports.run_html_report
+        else:
+            run = reports.run_bulk_report
+            kwargs["fresh"] = args.fresh
+        result = run(
+            args.db,
+            args.project,
+            args.session_id,
+            vo_id,
+            locations,
+            args.start,
+            args.end,
+            output,
+            **kwargs,
+        )
+        print(file=sys.stderr)
+        if result.get("resumed_count"):
+            print(f"Dilanjutkan dari checkpoint: {result['resumed_count']} lokasi sudah selesai")
+        print(
+            f"Selesai! Berhasil: {result['success_count']}, "
+            f"Gagal/Kosong: {len(result['error_logs'])} -> {output}"
+        )
+        if result["failures"]:
+            print(reports.format_failures(result["failures"]))
+    else:
+        output = args.output or reports.artifact_path(
+            args.project, args.start, args.end, "summary", ".csv"
+        )
+        df_summary = reports.run_summary_report(
+            args.db,
+            args.session_id,
+            vo_id,
+            locations,
+            args.start,
+            args.end,
+            controller=controller,
+            on_progress=print_progress(controller),
+        )
+        print(file=sys.stderr)
+        failures = df_summary.attrs.get("failures")
+        if failures:
+            print(f"Tidak masuk rekap: {reports.format_failures(failures)}", file=sys.stderr)
+        if df_summary.empty:
+            print("Gagal mengambil data rekap. Pastikan Session ID Valid.", file=sys.stderr)
+            return 1
+        df_summary.to_csv(output, index=False)
+        print(
+            f"Selesai! {len(df_summary)} / {len(locations)} lokasi aktif, "
+            f"total {df_summary['Total Usage (GB)'].sum():,.2f} GB -> {output}"
+        )
+
+    if args.metrics_file:
+        metrics.write_textfile(args.metrics_file)
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        init_db(args.db)
+        return run_warm(args)
+
+    if not args.session_id:
+        parser.error("Session ID kosong (pakai --session-id atau WIFI_SESSION_ID)")
+    if args.end < args.start:
+        parser.error("--end harus >= --start")
+
+    init_db(args.db)
+    if args.project == ALL_PROJECTS:
+        return run_all_projects(args)
+
+    locations = load_from_db(args.project, args.db)
+    if locations.empty:
+        print(f"Tidak ada lokasi untuk proyek {args.project} di {args.db}", file=sys.stderr)
+        return 1
+
+    vo_id = PROJECT_CONFIG[args.project]["vo_id"]
+    controller = make_controller(args.concurrency)
+
+    print(f"{args.project}: {len(locations)} lokasi", file=sys.stderr)
+
+    try:
+        return run_project(args, locations, vo_id, controller)
+    except wifi_api.FetchError as exc:
+        # Preflight gagal: tidak ada request lokasi yang dikirim
+        print(f"Dibatalkan: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+# --- ADAPTIVE CONCURRENCY (AIMD) ---
+# Kapasitas backend wifi.id naik-turun sepanjang hari. Daripada angka worker
+# tetap, jumlah request paralel diatur otomatis:
+# - Additive Increase: setiap satu "putaran" (limit request) sukses & cepat -> limit + 1
+# - Multiplicative Decrease: ada error (5xx/timeout) atau latency melonjak -> limit x 0.5
+# Sinyal macet pertama dalam satu putaran langsung menurunkan limit (tidak
+# menunggu putaran selesai). Penurunan maksimal sekali per putaran supaya satu
+# gelombang error tidak langsung menjatuhkan limit ke minimum, dan putaran
+# yang berisi sinyal macet (di posisi mana pun) tidak pernah menaikkan limit.
+
+AIMD_MIN_LIMIT = 2
+AIMD_MAX_LIMIT = 64
+AIMD_INITIAL_LIMIT = 8
+AIMD_DECREASE_FACTOR = 0.5
+# Latency dianggap "macet" kalau > LATENCY_FACTOR x latency terbaik
+# (dan di atas LATENCY_FLOOR detik, biar jitter kecil tidak dihitung).
+LATENCY_FACTOR = 3.0
+LATENCY_FLOOR = 2.0
+STATS_WINDOW = 50
+THROUGHPUT_WINDOW = 10.0
+
+
+class AimdController:
+    def __init__(
+        self,
+        initial=AIMD_INITIAL_LIMIT,
+        min_limit=AIMD_MIN_LIMIT,
+        max_limit=AIMD_MAX_LIMIT,
+        decrease_factor=AIMD_DECREASE_FACTOR,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._best_latency = None
+        self._since_change = 0
+        self._round_congested = False  # putaran ini ada error / latency lambat
+        self._round_decreased = False  # limit sudah diturunkan di putaran ini
+        self._outcomes = deque(maxlen=STATS_WINDOW)
+        self._latencies = deque(maxlen=STATS_WINDOW)
+        self._completed_at = deque()
+
+    @classmethod
+    def fixed(cls, limit):
+        # Mode Safe/Turbo: limit tetap, tapi statistik tetap dicatat
+        return cls(initial=limit, min_limit=limit, max_limit=limit)
+
+    @property
+    def adaptive(self):
+        return self.min_limit != self.max_limit
+
+    def _is_slow(self, latency):
+        if self._best_latency is None:
+            return False
+        return latency > max(LATENCY_FLOOR, LATENCY_FACTOR * self._best_latency)
+
+    def on_result(self, latency, ok):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append(ok)
+            self._latencies.append(latency)
+            self._completed_at.append(now)
+            while self._completed_at and now - self._completed_at[0] > THROUGHPUT_WINDOW:
+                self._completed_at.popleft()
+
+            slow = ok and self._is_slow(latency)
+            if ok:
+                # Baseline pelan-pelan naik lagi supaya ikut drift latency server
+                if self._best_latency is None or latency < self._best_latency:
+                    self._best_latency = latency
+                else:
+                    self._best_latency = min(latency, self._best_latency * 1.01)
+
+            self._since_change += 1
+            if not ok or slow:
+                self._round_congested = True
+                if not self._round_decreased:
+                    # Putaran baru dimulai dengan limit yang sudah turun; hasil
+                    # request lama yang masih in-flight tidak menurunkan lagi
+                    self.limit = max(
+                        self.min_limit, int(self.limit * self.decrease_factor)
+                    )
+                    self._round_decreased = True
+                    self._round_congested = False
+                    self._since_change = 0
+                    return
+
+            if self._since_change >= self.limit:
+                if not self._round_congested:
+                    self.limit = min(self.max_limit, self.limit + 1)
+                self._since_change = 0
+                self._round_congested = False
+                self._round_decreased = False
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            recent = [t for t in self._completed_at if now - t <= THROUGHPUT_WINDOW]
+            if len(recent) > 1:
+                throughput = len(recent) / max(now - recent[0], 1e-6)
+            else:
+                throughput = 0.0
+            latencies = sorted(self._latencies)
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "throughput": throughput,
+                "error_rate": (
+                    self._outcomes.count(False) / len(self._outcomes)
+                    if self._outcomes
+                    else 0.0
+                ),
+                "p50_latency": latencies[len(latencies) // 2] if latencies else 0.0,
+            }
+
+
+class AdaptiveLimiter:
+    # Pengganti asyncio.Semaphore yang kapasitasnya mengikuti controller.limit
+    def __init__(self, controller):
+        self.controller = controller
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self.controller.in_flight < self.controller.limit
+            )
+            self.controller.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started_at, ok):
+        # ok=None: slot dikembalikan tanpa request (tidak dihitung ke AIMD)
+        if ok is not None:
+            self.controller.on_result(time.monotonic() - started_at, ok)
+        async with self._cond:
+            self.controller.in_flight -= 1
+            self._cond.notify_all()
+
+
+def format_stats(controller):
+    stats = controller.snapshot()
+    return (
+        f"⚙️ Concurrency: {stats['in_flight']}/{stats['limit']} | "
+        f"⚡ {stats['throughput']:.1f} req/s | "
+        f"Error: {stats['error_rate']:.0%}"
+    )
@@ -0,0 +1,15 @@
+import os
+
+# --- CONFIG PROYEK ---
+# Dipakai bersama oleh dashboard (app.py) dan CLI batch (cli.py)
+# SQLite mode WAL butuh file -wal/-shm di folder yang sama dengan DB,
+# jadi di Docker yang di-mount adalah foldernya (lihat docker-compose.yml)
+DB_NAME = os.environ.get("WIFI_DB_PATH", "wifi_locations.db")
+
+PROJECT_CONFIG = {
+    "Kecamatan Berdaya": {"vo_id": "15557"},
+    "Pendidikan": {"vo_id": "13231"},
+    "Pelayanan Publik": {"vo_id": "12945"},
+    "WMS POLDA Jawa Tengah": {"vo_id": "13329"},
+    "Lainnya": {"vo_id": "15557"},
+}
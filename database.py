@@ -0,0 +1,198 @@
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import jobs
+import metrics
+import usage_store
+from config import DB_NAME
+from location_index import LocationIndex
+from sqlite_pool import get_connection
+
+# Lokasi per proyek di-cache di memori (dibaca tiap interaksi widget),
+# dibuang otomatis setiap kali ada tulis ke tabel locations.
+# DataFrame hasil load_from_db dipakai bersama: jangan diubah in-place.
+_locations_cache = {}
+_index_cache = {}
+_cache_lock = threading.Lock()
+_initialized = set()
+
+
+def _invalidate(project_name, db_path):
+    with _cache_lock:
+        _locations_cache.pop((db_path, project_name), None)
+        _index_cache.pop((db_path, project_name), None)
+
+
+# --- DATABASE SETUP ---
+def init_db(db_path=DB_NAME):
+    # Cukup sekali per proses (dipanggil di setiap rerun Streamlit)
+    if db_path in _initialized:
+        return
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS locations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name TEXT,
+                loc_id TEXT,
+                site_name TEXT
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_locations_project_loc "
+            "ON locations (project_name, loc_id)"
+        )
+        # Session wifi.id terakhir per proyek (dipakai warmer malam hari)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS project_sessions (
+                project_name TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        usage_store.init_usage_table(conn)
+        jobs.init_job_tables(conn)
+    _initialized.add(db_path)
+
+
+@metrics.timed("sqlite")
+def save_session(project_name, session_id, db_path=DB_NAME):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO project_sessions (project_name, session_id, updated_at) "
+            "VALUES (?, ?, ?)",
+            (project_name, session_id, datetime.now().isoformat(timespec="seconds")),
+        )
+
+
+@metrics.timed("sqlite")
+def load_sessions(db_path=DB_NAME):
+    # {project_name: session_id}
+    rows = get_connection(db_path).execute(
+        "SELECT project_name, session_id FROM project_sessions"
+    ).fetchall()
+    return dict(rows)
+
+
+def save_location_rows(project_name, chunks, db_path=DB_NAME):
+    # chunks: iterable list [(loc_id, site_name), ...]. File dibaca & di-parse
+    # dulu (di luar transaksi, cuma list tuple, jauh lebih kecil dari
+    # DataFrame), baru transaksi tulis dibuka: isi tabel staging (TEMP) lalu
+    # di-diff dengan tabel locations dalam SQL. Upload ulang: hanya baris yang
+    # berubah yang ditulis (tambah / hapus / ganti nama), bukan hapus semua lalu
+    # insert ulang. LOC_ID dobel: yang pertama dipakai. Return jumlah
+    # perubahan {"added", "removed", "renamed"}.
+    staged = list(chunks)
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS locations_import (
+                loc_id TEXT PRIMARY KEY,
+                site_name TEXT
+            )
+        """)
+        conn.execute("DELETE FROM locations_import")
+        with metrics.timed("sqlite"):
+            for chunk in staged:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO locations_import (loc_id, site_name) VALUES (?, ?)",
+                    chunk,
+                )
+            changes = _apply_import(conn, project_name)
+        conn.execute("DELETE FROM locations_import")
+    _invalidate(project_name, db_path)
+    return changes
+
+
+def _apply_import(conn, project_name):
+    params = (project_name,)
+    # Sisa upload lama yang dobel (dulu selalu insert ulang tanpa cek)
+    conn.execute(
+        """
+        DELETE FROM locations WHERE project_name = ? AND id NOT IN (
+            SELECT MIN(id) FROM locations WHERE project_name = ? GROUP BY loc_id
+        )
+        """,
+        (project_name, project_name),
+    )
+    removed = conn.execute(
+        """
+        DELETE FROM locations WHERE project_name = ?
+            AND loc_id NOT IN (SELECT loc_id FROM locations_import)
+        """,
+        params,
+    ).rowcount
+    renamed = conn.execute(
+        """
+        UPDATE locations SET site_name = (
+            SELECT i.site_name FROM locations_import i WHERE i.loc_id = locations.loc_id
+        )
+        WHERE project_name = ? AND EXISTS (
+            SELECT 1 FROM locations_import i
+            WHERE i.loc_id = locations.loc_id AND i.site_name IS NOT locations.site_name
+        )
+        """,
+        params,
+    ).rowcount
+    added = conn.execute(
+        """
+        INSERT INTO locations (project_name, loc_id, site_name)
+        SELECT ?, loc_id, site_name FROM locations_import
+        WHERE loc_id NOT IN (SELECT loc_id FROM locations WHERE project_name = ?)
+        ORDER BY rowid
+        """,
+        (project_name, project_name),
+    ).rowcount
+    return {"added": added, "removed": removed, "renamed": renamed}
+
+
+def save_to_db(df, project_name, db_path=DB_NAME):
+    site_names = df["SITE_NAME"].astype(object).where(df["SITE_NAME"].notna(), None)
+    rows = list(zip(df["LOC_ID"].astype(str).tolist(), site_names.tolist()))
+    return save_location_rows(project_name, [rows], db_path)
+
+
+def load_from_db(project_name, db_path=DB_NAME):
+    key = (db_path, project_name)
+    with _cache_lock:
+        df = _locations_cache.get(key)
+    if df is not None:
+        return df
+
+    with metrics.timed("sqlite"):
+        df = pd.read_sql_query(
+            "SELECT loc_id, site_name FROM locations WHERE project_name = ? ORDER BY id",
+            get_connection(db_path),
+            params=(project_name,),
+        )
+    df.columns = ["LOC_ID", "SITE_NAME"]
+    with _cache_lock:
+        _locations_cache[key] = df
+    return df
+
+
+def load_location_index(project_name, db_path=DB_NAME):
+    # Index pencarian Tab 1, ikut cache load_from_db: dibangun ulang hanya
+    # kalau daftar lokasi proyek berubah
+    df = load_from_db(project_name, db_path)
+    key = (db_path, project_name)
+    with _cache_lock:
+        index = _index_cache.get(key)
+    if index is not None and index.locations is df:
+        return index
+
+    index = LocationIndex(df)
+    with _cache_lock:
+        _index_cache[key] = index
+    return index
+
+
+@metrics.timed("sqlite")
+def delete_project_data(project_name, db_path=DB_NAME):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("DELETE FROM locations WHERE project_name = ?", (project_name,))
+    _invalidate(project_name, db_path)
@@ -0,0 +1,297 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+import usage_store
+import wifi_api
+from concurrency import AdaptiveLimiter, AimdController
+from singleflight import usage_flight, usage_key
+from usage_cache import usage_cache
+
+# --- ASYNC FETCH ENGINE ---
+# Satu event loop + satu connection pool keep-alive untuk semua lokasi,
+# menggantikan ThreadPoolExecutor (1 thread OS per request).
+# Hasil dikirim balik satu per satu begitu selesai (mirip as_completed).
+
+DEFAULT_MAX_IN_FLIGHT = 32
+DEFAULT_PER_HOST = 64
+
+# --- CIRCUIT BREAKER ---
+# Session kadaluarsa / wifi.id down: setelah sekian kegagalan berturut-turut,
+# lokasi sisanya tidak dikirim lagi (dicatat "Skipped") daripada tiap lokasi
+# menunggu retry + timeout sendiri-sendiri.
+BREAKER_THRESHOLD = 5
+BREAKER_REASONS = (wifi_api.SESSION_INVALID, wifi_api.UPSTREAM_DOWN)
+CANCELLED = "Cancelled"
+# Error tak terduga di sisi kita (SQLite, bug parse, ...): bukan tanda wifi.id
+# down, jadi tidak dihitung breaker
+INTERNAL_ERROR = "Internal Error"
+# Error yang sama untuk siapa pun -> boleh dibagi ke request identik lain.
+# Cancelled / Skipped / Session Invalid milik engine (atau session) ini saja.
+SHARED_REASONS = (wifi_api.UPSTREAM_DOWN, wifi_api.NO_DATA)
+
+
+def shared_error(exc):
+    return isinstance(exc, wifi_api.FetchError) and exc.reason in SHARED_REASONS
+
+
+def skipped_reason(reason):
+    return f"Skipped ({reason})"
+
+
+FetchRequest = namedtuple(
+    "FetchRequest", ["session_id", "vo_id", "loc_id", "start_date", "end_date"]
+)
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class FetchEngine:
+    def __init__(
+        self,
+        db_path,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        per_host=DEFAULT_PER_HOST,
+        timeout=wifi_api.REQUEST_TIMEOUT,
+        retries=wifi_api.RETRY_TOTAL,
+        backoff=wifi_api.RETRY_BACKOFF,
+        controller=None,
+        as_series=False,
+        breaker_threshold=BREAKER_THRESHOLD,
+    ):
+        self.db_path = db_path
+        # as_series=True: hasil UsageSeries (summary), tanpa bikin DataFrame
+        self.as_series = as_series
+        # Tanpa controller = limit tetap (max_in_flight)
+        self.controller = controller or AimdController.fixed(max_in_flight)
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._cancelled = threading.Event()
+        self.breaker_threshold = breaker_threshold
+        self.tripped = None  # Alasan breaker putus (None = masih jalan)
+        self.failures = {}  # FetchRequest -> alasan gagal
+        self._consecutive = 0
+
+    def cancel(self):
+        # Dipanggil dari thread lain (misal user pindah halaman / rerun)
+        self._cancelled.set()
+
+    def failure(self, req):
+        # Alasan gagal satu request (None kalau sukses / data kosong)
+        return self.failures.get(req)
+
+    def _check_open(self):
+        if self._cancelled.is_set():
+            raise wifi_api.FetchError(CANCELLED)
+        if self.tripped:
+            raise wifi_api.FetchError(skipped_reason(self.tripped))
+
+    def _record(self, req, reason=None):
+        # Semua dipanggil dari thread event loop, tanpa lock
+        if reason is None:
+            self._consecutive = 0
+            return
+        self.failures[req] = reason
+        if reason not in BREAKER_REASONS:
+            return
+        self._consecutive += 1
+        if self.tripped is None and self._consecutive >= self.breaker_threshold:
+            self.tripped = reason
+            metrics.inc("circuit_breaker_trips_total", reason=reason)
+
+    async def _post(self, http, limiter, req, start_date, end_date):
+        import aiohttp
+
+        error = wifi_api.FetchError(wifi_api.UPSTREAM_DOWN)
+        for attempt in range(self.retries + 1):
+            self._check_open()
+            if attempt:
+                metrics.inc("http_retries_total")
+            started_at = await limiter.acquire()
+            if self._cancelled.is_set() or self.tripped:
+                # Breaker putus selagi antre slot: kembalikan slot tanpa request
+                await limiter.release(started_at, None)
+                self._check_open()
+            ok = False
+            status = "error"
+            try:
+                async with http.post(
+                    wifi_api.PLINECHART_URL,
+                    headers=wifi_api.build_headers(req.session_id),
+                    data=wifi_api.build_payload(
+                        req.vo_id, req.loc_id, start_date, end_date
+                    ),
+                ) as response:
+                    status = response.status
+                    if response.status in wifi_api.RETRY_STATUS:
+                        raise _RetryableError(response.status)
+                    ok = True
+                    body = await response.read()
+                    metrics.inc("http_bytes_total", len(body))
+                    metrics.observe(
+                        "stage_seconds", time.monotonic() - started_at, stage="fetch"
+                    )
+                # Session invalid tidak di-retry: hasilnya pasti sama
+                with metrics.timed("parse"):
+                    data = wifi_api.decode_response(status, body)
+                    return wifi_api.parse_usage_records(data)
+            except (_RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = wifi_api.FetchError(
+                    wifi_api.UPSTREAM_DOWN, str(exc) or type(exc).__name__
+                )
+            finally:
+                metrics.inc("http_requests_total", status=status)
+                await limiter.release(started_at, ok)
+            if attempt < self.retries:
+                # Backoff sama seperti urllib3 Retry: 1s, 2s, 4s, ... Tidur di
+                # luar slot limiter: slot dipakai request lain, dan latency
+                # yang dilaporkan ke AIMD tidak ikut menghitung backoff.
+                await asyncio.sleep(self.backoff * (2**attempt))
+        raise error
+
+    async def _fetch_usage(self, http, limiter, req):
+        # SQLite di thread lain: event loop tidak ikut berhenti selagi menunggu
+        # lock tulis (misalnya import lokasi sedang jalan)
+        for gap_start, gap_end in await asyncio.to_thread(
+            usage_store.missing_ranges,
+            self.db_path,
+            req.vo_id,
+            req.loc_id,
+            req.start_date,
+            req.end_date,
+        ):
+            records = await self._post(http, limiter, req, gap_start, gap_end)
+            await asyncio.to_thread(
+                usage_store.save_range,
+                self.db_path,
+                req.vo_id,
+                req.loc_id,
+                gap_start,
+                gap_end,
+                records,
+            )
+        return await asyncio.to_thread(
+            usage_store.load_series,
+            self.db_path,
+            req.vo_id,
+            req.loc_id,
+            req.start_date,
+            req.end_date,
+        )
+
+    async def _fetch_one(self, http, limiter, req):
+        # Cache RAM dulu, lalu request identik yang sedang jalan (run lain /
+        # Tab 1) dipakai bersama
+        key = usage_key(req.vo_id, req.loc_id, req.start_date, req.end_date)
+        series = usage_cache.get(key)
+        if series is None:
+            try:
+                series = await usage_flight.do_async(
+                    key,
+                    lambda: self._fetch_usage(http, limiter, req),
+                    share_error=shared_error,
+                )
+            except wifi_api.FetchError as exc:
+                self._record(req, exc.reason)
+            except Exception:
+                self._record(req, INTERNAL_ERROR)
+            else:
+                self._record(req)
+            usage_cache.put(key, series)
+        if series is None or self.as_series:
+            return req, series
+        with metrics.timed("frame"):
+            return req, series.to_frame()
+
+    async def stream(self, requests):
+        # Async generator: yield (FetchRequest, DataFrame / UsageSeries / None)
+        # sesuai urutan selesai; alasan None ada di engine.failure(req).
+        # aiohttp di-import saat fetch pertama, bukan saat dashboard start
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.controller.max_limit, limit_per_host=self.per_host, ssl=False
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        limiter = AdaptiveLimiter(self.controller)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+            tasks = [
+                asyncio.ensure_future(self._fetch_one(http, limiter, req))
+                for req in requests
+            ]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+_DONE = object()
+
+
+def iter_results(engine, requests):
+    # Jembatan ke kode sync (Streamlit): event loop jalan di thread sendiri,
+    # hasil dialirkan lewat queue supaya progress bar bisa update per lokasi.
+    results = queue.Queue()
+
+    def runner():
+        async def consume():
+            async for item in engine.stream(requests):
+                results.put(item)
+
+        try:
+            asyncio.run(consume())
+        except BaseException as exc:
+            results.put(exc)
+        finally:
+            results.put(_DONE)
+
+    thread = threading.Thread(target=runner, name="fetch-engine", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        engine.cancel()
+
+
+def fetch_many(
+    db_path,
+    session_id,
+    vo_id,
+    loc_ids,
+    start_date,
+    end_date,
+    max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    per_host=DEFAULT_PER_HOST,
+    controller=None,
+    as_series=False,
+):
+    # Yield (loc_id, hasil / None, alasan gagal / None)
+    engine = FetchEngine(
+        db_path,
+        max_in_flight=max_in_flight,
+        per_host=per_host,
+        controller=controller,
+        as_series=as_series,
+    )
+    requests = [
+        FetchRequest(session_id, vo_id, loc_id, start_date, end_date)
+        for loc_id in loc_ids
+    ]
+    for req, df in iter_results(engine, requests):
+        yield req.loc_id, df, engine.failure(req)
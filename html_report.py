@@ -0,0 +1,191 @@
+import html
+import os
+import shutil
+from datetime import datetime
+
+import metrics
+
+# --- LAPORAN HTML (SATU FILE, CHART VEKTOR) ---
+# Alternatif ZIP PNG untuk bulk download: satu file HTML mandiri (plotly.js
+# ikut di-embed, bisa dibuka offline) berisi halaman ringkasan + satu chart
+# interaktif per lokasi. Tidak ada rasterisasi kaleido sama sekali.
+#
+# Chart ditulis ke file sementara (.part) begitu hasil lokasi datang, jadi
+# memori tetap kecil walau ribuan lokasi. Ringkasan baru diketahui di akhir,
+# jadi finish() menyusun file final: header + ringkasan + isi .part.
+# Di browser chart baru di-plot saat discroll ke dekatnya (IntersectionObserver)
+# supaya ribuan chart tidak dirender sekaligus.
+#
+# Semua chart satu laporan memakai template yang sama (trace style, axis,
+# legend, template plotly ~7 KB). Template itu ditulis sekali di <head>; per
+# lokasi hanya judul + array x/y yang di-embed, lalu digabung lagi di browser.
+
+CHART_HEIGHT = 520
+
+_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0 auto;
+       max-width: 1200px; padding: 24px; color: #222; }
+h1 { margin-bottom: 4px; }
+.muted { color: #777; }
+.cards { display: flex; gap: 16px; margin: 16px 0; }
+.card { border: 1px solid #ddd; border-radius: 8px; padding: 12px 16px; }
+.card b { display: block; font-size: 22px; }
+table { border-collapse: collapse; width: 100%%; font-size: 14px; }
+th, td { border-bottom: 1px solid #eee; padding: 6px 8px; text-align: left; }
+td.num { text-align: right; }
+section.location { border-top: 1px solid #ddd; padding-top: 12px; margin-top: 24px;
+                   page-break-inside: avoid; }
+.chart { height: %dpx; }
+""" % CHART_HEIGHT
+
+_LAZY_PLOT = """
+document.addEventListener("DOMContentLoaded", function () {
+  function plot(el) {
+    var chart = JSON.parse(document.getElementById(el.id + "-spec").textContent);
+    // Template di-parse ulang per chart: Plotly mengubah layout yang dipakai
+    var spec = JSON.parse(
+      document.getElementById("chart-template-" + chart.template).textContent
+    );
+    spec.data.forEach(function (trace, i) {
+      trace.x = chart.x;
+      trace.y = chart.y[i];
+    });
+    spec.layout.title.text = chart.title;
+    Plotly.newPlot(el, spec.data, spec.layout, {responsive: true, displaylogo: false});
+  }
+  var charts = document.querySelectorAll(".chart");
+  if (!("IntersectionObserver" in window)) {
+    charts.forEach(plot);
+    return;
+  }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) return;
+      observer.unobserve(entry.target);
+      plot(entry.target);
+    });
+  }, {rootMargin: "600px"});
+  charts.forEach(function (el) { observer.observe(el); });
+});
+"""
+
+
+def _json(obj):
+    # JSON aman di dalam <script>: "</" tidak boleh menutup tag
+    from plotly.io.json import to_json_plotly
+
+    return to_json_plotly(obj).replace("</", "<\\/")
+
+
+def _split_spec(spec):
+    # spec ChartFactory -> (template tanpa data & judul, data per chart)
+    template = {
+        "data": [
+            {k: v for k, v in trace.items() if k not in ("x", "y")}
+            for trace in spec["data"]
+        ],
+        "layout": dict(spec["layout"], title=dict(spec["layout"]["title"], text="")),
+    }
+    chart = {
+        "title": spec["layout"]["title"]["text"],
+        "x": spec["data"][0]["x"],
+        "y": [trace["y"] for trace in spec["data"]],
+    }
+    return template, chart
+
+
+class HtmlReportWriter:
+    def __init__(self, path, title, subtitle=""):
+        self.path = path
+        self.title = title
+        self.subtitle = subtitle
+        self.entries = []  # (site_name, loc_id, total_usage_gb, anchor)
+        self.templates = []  # Biasanya cuma satu (satu granularitas per laporan)
+        self._part_path = path + ".part"
+        self._body = open(self._part_path, "w", encoding="utf-8")
+
+    def add_chart(self, loc_id, site_name, spec, total_usage_gb):
+        anchor = f"loc-{len(self.entries) + 1}"
+        self.entries.append((site_name, loc_id, total_usage_gb, anchor))
+        with metrics.timed("html"):
+            template, chart = _split_spec(spec)
+            if template not in self.templates:
+                self.templates.append(template)
+            chart["template"] = self.templates.index(template)
+            self._body.write(
+                f'<section class="location">'
+                f"<h3>{html.escape(str(site_name))} ({html.escape(str(loc_id))})</h3>"
+                f'<div class="chart" id="{anchor}"></div>'
+                f'<script type="application/json" id="{anchor}-spec">'
+                f"{_json(chart)}</script></section>\n"
+            )
+
+    def _write_summary(self, out, error_logs, failures):
+        # failures: Counter alasan -> jumlah lokasi
+        total_usage = sum(entry[2] for entry in self.entries)
+        out.write(
+            f"<h1>{html.escape(self.title)}</h1>"
+            f'<div class="muted">{html.escape(self.subtitle)} | '
+            f"Dibuat {datetime.now():%d/%m/%Y %H:%M}</div>"
+            '<div class="cards">'
+            f'<div class="card">Lokasi dengan Data<b>{len(self.entries)}</b></div>'
+            f'<div class="card">Gagal / Kosong<b>{len(error_logs)}</b></div>'
+            f'<div class="card">Total Usage<b>{total_usage:,.2f} GB</b></div>'
+            "</div>"
+        )
+
+        out.write(
+            "<h2>Ringkasan per Lokasi</h2><table><tr><th>#</th>"
+            "<th>Kecamatan/Lokasi</th><th>LOC ID</th><th>Total Usage (GB)</th></tr>"
+        )
+        ranked = sorted(self.entries, key=lambda entry: entry[2], reverse=True)
+        for rank, (site_name, loc_id, usage, anchor) in enumerate(ranked, 1):
+            out.write(
+                f'<tr><td>{rank}</td><td><a href="#{anchor}">'
+                f"{html.escape(str(site_name))}</a></td>"
+                f'<td>{html.escape(str(loc_id))}</td><td class="num">{usage:,.2f}</td></tr>'
+            )
+        out.write("</table>")
+
+        if error_logs:
+            breakdown = ", ".join(
+                f"{html.escape(reason)}: {count}"
+                for reason, count in failures.most_common()
+            )
+            out.write(
+                f"<h2>Gagal / Kosong</h2><p>{breakdown}</p><pre>"
+                + html.escape("\n".join(error_logs))
+                + "</pre>"
+            )
+        out.write("<h2>Chart per Lokasi</h2>")
+
+    def finish(self, error_logs, failures):
+        from plotly.offline import get_plotlyjs
+
+        self._body.close()
+        with metrics.timed("html"), open(self.path, "w", encoding="utf-8") as out:
+            out.write(
+                '<!DOCTYPE html><html lang="id"><head><meta charset="utf-8">'
+                f"<title>{html.escape(self.title)}</title>"
+                f"<style>{_STYLE}</style>"
+                f"<script>{get_plotlyjs()}</script>"
+            )
+            for i, template in enumerate(self.templates):
+                out.write(
+                    f'<script type="application/json" id="chart-template-{i}">'
+                    f"{_json(template)}</script>"
+                )
+            out.write("</head><body>")
+            self._write_summary(out, error_logs, failures)
+            with open(self._part_path, encoding="utf-8") as body:
+                shutil.copyfileobj(body, out)
+            out.write(f"<script>{_LAZY_PLOT}</script></body></html>")
+        os.remove(self._part_path)
+        return self.path
+
+    def abort(self):
+        self._body.close()
+        try:
+            os.remove(self._part_path)
+        except OSError:
+            pass
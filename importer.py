@@ -0,0 +1,163 @@
+import csv
+import io
+import os
+
+from database import save_location_rows
+
+# --- IMPORT LOKASI (STREAMING EXCEL / CSV) ---
+# Master list bisa puluhan ribu baris + beberapa sheet. Yang dibaca dulu hanya
+# baris header untuk menebak kolom LOC_ID & nama lokasi, lalu isi sheet
+# dibaca per potong (chunk) jadi list tuple -- tanpa pd.read_excel seluruh
+# workbook ke memori -- dan baru ditulis ke SQLite setelah selesai di-parse
+# (transaksi tulis tidak ikut menunggu parsing). LOC_ID kosong dibuang, yang
+# dobel dihitung dan hanya yang pertama dipakai.
+
+IMPORT_CHUNK_SIZE = 2000
+SITE_NAME_HINTS = ["KEC", "NAM", "LOK", "GED", "SITE"]
+
+
+class LocationImportError(Exception):
+    pass
+
+
+def normalize_header(value):
+    return str(value or "").strip().upper().replace(" ", "_")
+
+
+def detect_columns(header):
+    # -> (index LOC_ID, index SITE_NAME) atau (None, None); heuristik sama
+    # seperti upload Excel lama
+    columns = [normalize_header(h) for h in header]
+    col_loc_id = None
+    col_site_name = None
+    for i, col in enumerate(columns):
+        if "LOC" in col:
+            col_loc_id = i
+        elif any(x in col for x in SITE_NAME_HINTS):
+            col_site_name = i
+
+    if col_site_name is None and len(columns) > 1:
+        col_site_name = 1 if col_loc_id == 0 else 0
+
+    if col_loc_id is None or col_site_name is None:
+        return None, None
+    return col_loc_id, col_site_name
+
+
+def clean_loc_id(value):
+    # Angka dari Excel (12345.0) -> "12345"
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _clean_site_name(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+# --- PEMBACA PER FORMAT ---
+# Masing-masing yield (nama sheet, header, iterator baris, perkiraan jumlah baris)
+def _iter_xlsx_sheets(file):
+    import openpyxl  # Hanya dibutuhkan saat import Excel
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            yield sheet.title, header, rows, max((sheet.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+
+def _iter_csv_sheets(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    first_line = text.readline()
+    # Excel versi Indonesia sering menyimpan CSV dengan pemisah ";"
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    header = next(csv.reader([first_line], delimiter=delimiter), None)
+    if header is None:
+        return
+    yield "CSV", header, csv.reader(text, delimiter=delimiter), None
+
+
+def iter_location_chunks(
+    file, filename, stats, chunk_size=IMPORT_CHUNK_SIZE, on_progress=None
+):
+    # Yield list [(loc_id, site_name), ...] per chunk; statistik diisi ke dict stats
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        sheets = _iter_csv_sheets(file)
+    elif ext in (".xlsx", ".xlsm"):
+        sheets = _iter_xlsx_sheets(file)
+    else:
+        raise LocationImportError(f"Format file tidak didukung: {ext or filename}")
+
+    seen = set()
+    chunk = []
+    for sheet_name, header, rows, total in sheets:
+        col_loc_id, col_site_name = detect_columns(header)
+        if col_loc_id is None:
+            stats["skipped_sheets"].append(sheet_name)
+            continue
+        stats["sheets"].append(sheet_name)
+        width = max(col_loc_id, col_site_name) + 1
+
+        for i, row in enumerate(rows, 1):
+            stats["rows"] += 1
+            if on_progress and i % chunk_size == 0:
+                on_progress(sheet_name, i, total)
+            if row is None or len(row) < width:
+                row = list(row or ()) + [None] * width
+            loc_id = clean_loc_id(row[col_loc_id])
+            if not loc_id:
+                stats["invalid"] += 1
+                continue
+            if loc_id in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(loc_id)
+            chunk.append((loc_id, _clean_site_name(row[col_site_name])))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if on_progress:
+            on_progress(sheet_name, total or stats["rows"], total)
+
+    stats["imported"] = len(seen)
+    if chunk:
+        yield chunk
+
+
+def import_locations(file, filename, project_name, db_path, on_progress=None):
+    # on_progress(sheet, baris_diproses, total_baris / None)
+    stats = {
+        "rows": 0,
+        "imported": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "sheets": [],
+        "skipped_sheets": [],
+    }
+    chunks = iter_location_chunks(file, filename, stats, on_progress=on_progress)
+
+    # Jangan sampai file salah format menghapus semua lokasi proyek: chunk
+    # pertama dicek dulu sebelum apa pun ditulis
+    first = next(chunks, None)
+    if first is None:
+        raise LocationImportError("Kolom LOC_ID tidak ditemukan / LOC_ID kosong semua.")
+
+    def all_chunks():
+        yield first
+        yield from chunks
+
+    stats.update(save_location_rows(project_name, all_chunks(), db_path))
+    return stats
@@ -0,0 +1,317 @@
+import hashlib
+import itertools
+import os
+import shutil
+import time
+import zipfile
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import metrics
+import usage_store
+from sqlite_pool import get_connection
+
+# --- BULK JOB (CHECKPOINT & RESUME) ---
+# Setiap bulk download punya record job di SQLite + folder PNG di disk.
+# Status per lokasi dicatat begitu selesai, jadi kalau run putus di tengah
+# (session expired, rerun, container restart) run berikutnya dengan
+# parameter yang sama hanya memproses lokasi yang gagal / belum jalan.
+# Checkpoint hanya untuk melanjutkan run yang putus, bukan cache hasil:
+# - job yang sudah "done" dijalankan ulang dari awal (chart ikut data terbaru)
+# - periode yang belum settle (usage_store.SETTLE_DAYS) datanya masih berubah,
+#   jadi PNG sukses yang lebih tua dari RESUME_HOURS di-render ulang
+# - job yang tidak disentuh selama JOB_TTL dihapus (folder PNG + record DB)
+
+JOB_DIR = "jobs"
+JOB_TTL = 7 * 24 * 3600
+RESUME_HOURS = 1
+ERROR_LOG_NAME = "00_LAPORAN_ERROR_LOG.txt"
+
+
+def init_job_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_jobs (
+            job_id TEXT PRIMARY KEY,
+            project_name TEXT NOT NULL,
+            vo_id TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    # status item: pending / success / error / empty
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_job_items (
+            job_id TEXT NOT NULL,
+            loc_id TEXT NOT NULL,
+            site_name TEXT,
+            status TEXT NOT NULL,
+            reason TEXT,
+            filename TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (job_id, loc_id)
+        )
+    """)
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def job_id_for(project_name, vo_id, start_date, end_date, granularity="daily"):
+    # Parameter sama = job sama, supaya run ulang otomatis melanjutkan.
+    # PNG harian tetap memakai id lama (checkpoint lama masih terpakai).
+    key = f"{project_name}|{vo_id}|{start_date.isoformat()}|{end_date.isoformat()}"
+    if granularity != "daily":
+        key += f"|{granularity}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def job_dir(job_id):
+    return os.path.join(JOB_DIR, job_id)
+
+
+def settled(end_date, today=None):
+    # Semua hari di periode sudah final -> PNG lama tetap akurat
+    today = today or date.today()
+    return today >= end_date + timedelta(days=usage_store.SETTLE_DAYS)
+
+
+def cleanup_expired_jobs(db_path, ttl=JOB_TTL):
+    # Folder job yang tidak ada PNG baru selama ttl detik dihapus beserta
+    # record-nya, supaya disk tidak penuh oleh checkpoint lama
+    if not os.path.isdir(JOB_DIR):
+        return []
+    now = time.time()
+    expired = []
+    for name in os.listdir(JOB_DIR):
+        try:
+            if now - os.path.getmtime(job_dir(name)) > ttl:
+                shutil.rmtree(job_dir(name))
+                expired.append(name)
+        except OSError:
+            pass
+    if expired:
+        conn = get_connection(db_path)
+        with conn:
+            conn.executemany(
+                "DELETE FROM bulk_job_items WHERE job_id = ?", [(j,) for j in expired]
+            )
+            conn.executemany(
+                "DELETE FROM bulk_jobs WHERE job_id = ?", [(j,) for j in expired]
+            )
+    return expired
+
+
+@metrics.timed("sqlite")
+def find_job(db_path, project_name, vo_id, start_date, end_date, granularity="daily"):
+    # Ringkasan job lama (kalau ada) untuk ditampilkan sebelum run
+    job_id = job_id_for(project_name, vo_id, start_date, end_date, granularity)
+    conn = get_connection(db_path)
+    job = conn.execute(
+        "SELECT status, updated_at FROM bulk_jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    if job is None:
+        return None
+    counts = dict(
+        conn.execute(
+            "SELECT status, COUNT(*) FROM bulk_job_items WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        ).fetchall()
+    )
+    return {
+        "job_id": job_id,
+        "status": job[0],
+        "updated_at": job[1],
+        "counts": counts,
+    }
+
+
+def open_bulk_job(
+    db_path,
+    project_name,
+    vo_id,
+    locations,
+    start_date,
+    end_date,
+    fresh=False,
+    granularity="daily",
+):
+    # Buat job baru atau lanjutkan job lama. Lokasi baru (upload ulang Excel)
+    # ditambahkan sebagai pending; fresh=True (atau job lama sudah "done")
+    # menghapus semua checkpoint.
+    cleanup_expired_jobs(db_path)
+    job_id = job_id_for(project_name, vo_id, start_date, end_date, granularity)
+    now = _now()
+
+    conn = get_connection(db_path)
+    if not fresh:
+        prev = conn.execute(
+            "SELECT status FROM bulk_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        fresh = prev is not None and prev[0] == "done"
+
+    if fresh:
+        shutil.rmtree(job_dir(job_id), ignore_errors=True)
+
+    with conn:
+        if fresh:
+            conn.execute("DELETE FROM bulk_job_items WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM bulk_jobs WHERE job_id = ?", (job_id,))
+        elif not settled(end_date):
+            # Data periode ini masih berubah: PNG dari run yang sudah lama
+            # (bukan run yang barusan putus) di-render ulang
+            stale_before = datetime.now() - timedelta(hours=RESUME_HOURS)
+            conn.execute(
+                """
+                UPDATE bulk_job_items SET status = 'pending', filename = NULL
+                WHERE job_id = ? AND status = 'success' AND updated_at < ?
+                """,
+                (job_id, stale_before.isoformat(timespec="seconds")),
+            )
+
+        conn.execute(
+            """
+            INSERT INTO bulk_jobs
+                (job_id, project_name, vo_id, start_date, end_date, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, 'running', ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET status = 'running', updated_at = excluded.updated_at
+            """,
+            (
+                job_id,
+                project_name,
+                str(vo_id),
+                start_date.isoformat(),
+                end_date.isoformat(),
+                now,
+                now,
+            ),
+        )
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO bulk_job_items
+                (job_id, loc_id, site_name, status, updated_at)
+            VALUES (?, ?, ?, 'pending', ?)
+            """,
+            zip(
+                itertools.repeat(job_id),
+                locations["LOC_ID"].astype(str).tolist(),
+                locations["SITE_NAME"].tolist(),
+                itertools.repeat(now),
+            ),
+        )
+
+    os.makedirs(job_dir(job_id), exist_ok=True)
+    return job_id
+
+
+@metrics.timed("sqlite")
+def todo_locations(db_path, job_id):
+    # Semua yang belum sukses: pending + error + empty (isi log error lama),
+    # plus yang sukses tapi file PNG-nya sudah hilang dari disk
+    conn = get_connection(db_path)
+    rows = conn.execute(
+        "SELECT loc_id, status, filename FROM bulk_job_items WHERE job_id = ?",
+        (job_id,),
+    ).fetchall()
+    return {
+        loc_id
+        for loc_id, status, filename in rows
+        if status != "success"
+        or not os.path.isfile(os.path.join(job_dir(job_id), filename or ""))
+    }
+
+
+@metrics.timed("sqlite")
+def checkpoint_failure(db_path, job_id, loc_id, status, reason):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute(
+            """
+            UPDATE bulk_job_items SET status = ?, reason = ?, filename = NULL, updated_at = ?
+            WHERE job_id = ? AND loc_id = ?
+            """,
+            (status, reason, _now(), job_id, str(loc_id)),
+        )
+
+
+def checkpoint_success(db_path, job_id, loc_id, filename, img_data):
+    # Tulis PNG dulu (atomic rename), baru tandai sukses di DB
+    path = os.path.join(job_dir(job_id), filename)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(img_data)
+    os.replace(tmp_path, path)
+
+    with metrics.timed("sqlite"):
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute(
+                """
+                UPDATE bulk_job_items SET status = 'success', reason = NULL, filename = ?, updated_at = ?
+                WHERE job_id = ? AND loc_id = ?
+                """,
+                (filename, _now(), job_id, str(loc_id)),
+            )
+
+
+def finish_job(db_path, job_id, project_name, loc_ids, zip_path):
+    # Susun ZIP dari checkpoint di disk (hanya lokasi yang masih terdaftar)
+    wanted = {str(loc_id) for loc_id in loc_ids}
+    conn = get_connection(db_path)
+    items = conn.execute(
+        """
+        SELECT loc_id, site_name, status, reason, filename FROM bulk_job_items
+        WHERE job_id = ? ORDER BY site_name
+        """,
+        (job_id,),
+    ).fetchall()
+
+    error_logs = []
+    failures = Counter()  # alasan -> jumlah lokasi
+    success_count = 0
+    with metrics.timed("zip"), zipfile.ZipFile(
+        zip_path, "w", zipfile.ZIP_DEFLATED, False
+    ) as zf:
+        for loc_id, site_name, status, reason, filename in items:
+            if loc_id not in wanted:
+                continue
+            png_path = os.path.join(job_dir(job_id), filename or "")
+            if status == "success" and os.path.isfile(png_path):
+                zf.write(png_path, filename)
+                success_count += 1
+            elif status == "success":
+                error_logs.append(f"[ERROR] {site_name} ({loc_id}): Checkpoint Missing")
+                failures["Checkpoint Missing"] += 1
+            else:
+                reason = reason or "Not Processed"
+                error_logs.append(f"[{status.upper()}] {site_name} ({loc_id}): {reason}")
+                failures[reason] += 1
+
+        # Tulis File Log Error ke dalam ZIP (rincian per alasan di atas)
+        if error_logs:
+            breakdown = "\n".join(
+                f"- {reason}: {count}" for reason, count in failures.most_common()
+            )
+            log_content = (
+                f"LAPORAN ERROR DOWNLOAD\nProject: {project_name}\nTanggal: {datetime.now()}\n\n"
+                + f"Ringkasan:\n{breakdown}\n\n"
+                + "\n".join(error_logs)
+            )
+            zf.writestr(ERROR_LOG_NAME, log_content)
+
+    with conn:
+        conn.execute(
+            "UPDATE bulk_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+            ("partial" if error_logs else "done", _now(), job_id),
+        )
+
+    return {
+        "job_id": job_id,
+        "zip_path": zip_path,
+        "success_count": success_count,
+        "error_logs": error_logs,
+        "failures": failures,
+    }
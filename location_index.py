@@ -0,0 +1,128 @@
+import bisect
+from collections import Counter, defaultdict
+
+# --- LOCATION INDEX (PENCARIAN CEPAT TAB 1) ---
+# Dibangun sekali per daftar lokasi (di-cache di database.py, dibuang saat
+# data lokasi berubah), bukan apply(lambda) ke seluruh DataFrame tiap rerun.
+# - lookup LOC_ID -> baris: dict, O(1)
+# - prefix LOC_ID / kata di nama lokasi: list terurut + bisect
+# - substring: kandidat dari irisan posting trigram query, baru dicek "in"
+#   (query < 3 huruf: scan biasa)
+# - fuzzy (salah ketik): skor trigram, hanya kalau tidak ada yang cocok
+# Hasil pencarian berupa daftar LOC_ID yang bisa dipaging.
+
+FUZZY_MIN_SCORE = 0.4
+FUZZY_MAX_RESULTS = 200
+PAGE_SIZE = 50
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    def __init__(self, locations):
+        # locations: DataFrame [LOC_ID, SITE_NAME] (hasil load_from_db)
+        self.locations = locations
+        self.loc_ids = [str(loc_id) for loc_id in locations["LOC_ID"].tolist()]
+        self.site_names = [
+            "" if name is None else str(name) for name in locations["SITE_NAME"].tolist()
+        ]
+        self.labels = [
+            f"{name} | {loc_id}" for name, loc_id in zip(self.site_names, self.loc_ids)
+        ]
+        self._lower = [label.lower() for label in self.labels]
+
+        # LOC_ID dobel (data lama): yang pertama dipakai
+        self._position = {}
+        for pos, loc_id in enumerate(self.loc_ids):
+            self._position.setdefault(loc_id, pos)
+
+        prefix_keys = [(loc_id.lower(), pos) for pos, loc_id in enumerate(self.loc_ids)]
+        for pos, name in enumerate(self.site_names):
+            prefix_keys.extend((word, pos) for word in name.lower().split())
+        prefix_keys.sort()
+        self._prefix_words = [key for key, _ in prefix_keys]
+        self._prefix_pos = [pos for _, pos in prefix_keys]
+
+        self._grams = defaultdict(list)
+        for pos, text in enumerate(self._lower):
+            for gram in _trigrams(text):
+                self._grams[gram].append(pos)
+        self._gram_count = [len(_trigrams(text)) for text in self._lower]
+
+    def __len__(self):
+        return len(self.loc_ids)
+
+    def __contains__(self, loc_id):
+        return str(loc_id) in self._position
+
+    def label(self, loc_id):
+        return self.labels[self._position[str(loc_id)]]
+
+    def row(self, loc_id):
+        return self.locations.iloc[self._position[str(loc_id)]]
+
+    def _prefix(self, query):
+        start = bisect.bisect_left(self._prefix_words, query)
+        end = bisect.bisect_left(self._prefix_words, query + "\uffff", lo=start)
+        return self._prefix_pos[start:end]
+
+    def _substring(self, query):
+        # -> posisi label yang mengandung query, urut posisi
+        if len(query) < 3:
+            return [pos for pos, text in enumerate(self._lower) if query in text]
+        postings = sorted(
+            (self._grams.get(query[i : i + 3], ()) for i in range(len(query) - 2)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(pos for pos in candidates if query in self._lower[pos])
+
+    def _fuzzy(self, query):
+        query_grams = _trigrams(query)
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(self._grams.get(gram, ()))
+        scored = []
+        for pos, common in hits.items():
+            # Porsi trigram query yang ada di label; seri -> label lebih pendek
+            score = common / len(query_grams)
+            if score >= FUZZY_MIN_SCORE:
+                scored.append((-score, self._gram_count[pos], pos))
+        scored.sort()
+        return [pos for _, _, pos in scored[:FUZZY_MAX_RESULTS]]
+
+    def search(self, query):
+        # -> list posisi baris, urut relevansi: LOC_ID persis, prefix, substring;
+        # fuzzy kalau tidak ada yang cocok. Query kosong = semua (urutan asli).
+        query = (query or "").strip().lower()
+        if not query:
+            return list(range(len(self.loc_ids)))
+
+        ordered = {}
+        for loc_id in (query, query.upper()):
+            if loc_id in self._position:
+                ordered[self._position[loc_id]] = None
+                break
+        for pos in sorted(self._prefix(query)):
+            ordered.setdefault(pos, None)
+        for pos in self._substring(query):
+            ordered.setdefault(pos, None)
+        if not ordered:
+            # Fuzzy hanya sebagai cadangan (salah ketik), biar hasil tidak ramai
+            for pos in self._fuzzy(query):
+                ordered.setdefault(pos, None)
+        return list(ordered)
+
+    def page(self, query, page=0, page_size=PAGE_SIZE):
+        # -> (list LOC_ID di halaman ini, total hasil)
+        positions = self.search(query)
+        start = page * page_size
+        loc_ids = [self.loc_ids[pos] for pos in positions[start : start + page_size]]
+        return loc_ids, len(positions)
@@ -0,0 +1,232 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- METRICS (INSTRUMENTASI HOT PATH) ---
+# Counter & histogram latency per tahap pipeline (fetch HTTP, parse JSON,
+# build DataFrame, build figure, render PNG, tulis ZIP / HTML, SQLite), plus
+# cache hit/miss, retry dan bytes dari wifi.id. Dibaca di Tab Admin dan
+# diekspos dalam format teks Prometheus (http://host:METRICS_PORT/metrics).
+# Semua in-memory per proses; aman dipanggil dari thread mana saja.
+
+METRIC_PREFIX = "wifi_dashboard_"
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9464"))  # 0 = tidak di-expose
+
+# Bucket latency (detik): dari parse JSON (ms) sampai request wifi.id yang lambat
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+STAGES = ["fetch", "parse", "frame", "chart", "render", "zip", "html", "sqlite"]
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Perkiraan dari bucket (batas atas bucket tempat kuantil jatuh)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def timed(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage)
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def stage_stats(self):
+        # Ringkasan per tahap untuk Tab Admin
+        with self._lock:
+            rows = []
+            for (name, label_key), hist in self._histograms.items():
+                if name != "stage_seconds":
+                    continue
+                rows.append(
+                    {
+                        "stage": dict(label_key).get("stage", ""),
+                        "count": hist.count,
+                        "total_s": round(hist.sum, 3),
+                        "avg_ms": round(hist.sum / hist.count * 1000, 1)
+                        if hist.count
+                        else 0.0,
+                        "p50_ms": hist.quantile(0.5) * 1000,
+                        "p95_ms": hist.quantile(0.95) * 1000,
+                        "p99_ms": hist.quantile(0.99) * 1000,
+                    }
+                )
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        return sorted(rows, key=lambda r: order.get(r["stage"], len(order)))
+
+    def counters(self):
+        with self._lock:
+            return [
+                {"name": name, "labels": dict(label_key), "value": value}
+                for (name, label_key), value in sorted(self._counters.items())
+            ]
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (hist.buckets, list(hist.counts), hist.sum, hist.count))
+                for key, hist in self._histograms.items()
+            )
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name in typed:
+                return
+            typed.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {self._help[name]}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        for (name, label_key), value in counters:
+            header(name, "counter")
+            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(label_key)} {value}")
+
+        for (name, label_key), (buckets, counts, total, count) in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                labels = _format_labels(label_key, [("le", str(bound))])
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{labels} {cumulative}")
+            plain = _format_labels(label_key)
+            lines.append(f"{METRIC_PREFIX}{name}_sum{plain} {total}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{plain} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Satu registry per proses (Streamlit server / CLI)
+registry = Registry()
+registry.describe("stage_seconds", "Latency per tahap pipeline (detik)")
+registry.describe("http_requests_total", "Request ke wifi.id per status HTTP")
+registry.describe("http_retries_total", "Retry request ke wifi.id")
+registry.describe("http_bytes_total", "Bytes response yang diterima dari wifi.id")
+registry.describe("cache_requests_total", "Lookup cache (per layer cache)")
+registry.describe("cache_misses_total", "Lookup cache yang harus fetch ulang")
+registry.describe("cache_evictions_total", "Entry cache yang dibuang (LRU, batas byte)")
+registry.describe("warmer_locations_total", "Lokasi yang di-prefetch warmer (per status)")
+
+inc = registry.inc
+observe = registry.observe
+timed = registry.timed
+
+
+# --- ENDPOINT PROMETHEUS ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Jangan banjiri log Streamlit tiap kali di-scrape
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port=METRICS_PORT, host="0.0.0.0"):
+    # Sekali per proses (aman dipanggil tiap rerun Streamlit).
+    # Return port yang dipakai, atau None kalau dimatikan / port bentrok.
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(
+                target=_server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+        return _server.server_address[1] if _server else None
+
+
+def write_textfile(path):
+    # Untuk CLI/cron: format textfile collector node_exporter (atomic rename)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render_prometheus())
+    os.replace(tmp_path, path)
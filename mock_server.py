@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import hashlib
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+# --- MOCK SERVER WIFI.ID (OFFLINE) ---
+# Pengganti lokal endpoint /vdash/dashboard/plinechart untuk benchmark dan
+# testing tanpa menyentuh venue.wifi.id produksi. Latency, jitter, error rate
+# dan "gelombang" 5xx bisa diatur. Data per lokasi deterministik (seed dari
+# loc_id) dengan pola weekday/weekend supaya mirip data asli.
+#
+# Contoh:
+#   python mock_server.py --port 8765 --latency 0.3 --jitter 0.2 --error-rate 0.02
+#   WIFI_API_URL=http://127.0.0.1:8765/vdash/dashboard/plinechart? streamlit run app.py
+
+PLINECHART_PATH = "/vdash/dashboard/plinechart"
+LOGIN_PAGE = "<html><body><form action='/login'>Silakan login</form></body></html>"
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency=0.2,
+        jitter=0.1,
+        error_rate=0.0,
+        empty_rate=0.0,
+        burst_every=0.0,
+        burst_length=0.0,
+        valid_session=None,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate  # peluang 5xx acak per request
+        self.empty_rate = empty_rate  # peluang lokasi tanpa data ([])
+        self.burst_every = burst_every  # tiap N detik ...
+        self.burst_length = burst_length  # ... selama M detik semua request 503
+        # Kalau diisi, PHPSESSID lain dibalas halaman login (session kadaluarsa)
+        self.valid_session = valid_session
+        self.random = random.Random(seed)
+        self.started_at = time.monotonic()
+        self.requests = 0
+
+
+def _loc_seed(loc_id):
+    return int(hashlib.md5(str(loc_id).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def build_rows(loc_id, start, end, empty_rate=0.0):
+    rng = random.Random(_loc_seed(loc_id))
+    if rng.random() < empty_rate:
+        return []
+
+    base_users = rng.randint(5, 400)
+    base_bytes = base_users * rng.randint(50, 300) * 1024**2
+    rows = []
+    day = start
+    while day <= end:
+        # Weekend lebih sepi, plus noise harian (tetap deterministik per tanggal)
+        day_rng = random.Random(_loc_seed(loc_id) ^ day.toordinal())
+        factor = (0.6 if day.weekday() >= 5 else 1.0) * day_rng.uniform(0.7, 1.3)
+        rows.append(
+            {
+                "PERIODE": day.strftime("%Y%m%d"),
+                "USAGES": str(int(base_bytes * factor)),
+                "TRAFIK": str(int(base_users * factor)),
+            }
+        )
+        day += timedelta(days=1)
+    return rows
+
+
+def create_app(config):
+    async def plinechart(request):
+        config.requests += 1
+        form = await request.post()
+
+        delay = max(0.0, config.latency + config.random.uniform(-1, 1) * config.jitter)
+        await asyncio.sleep(delay)
+
+        if config.valid_session and (
+            request.cookies.get("PHPSESSID") != config.valid_session
+        ):
+            return web.Response(text=LOGIN_PAGE, content_type="text/html")
+
+        if config.burst_every and config.burst_length:
+            phase = (time.monotonic() - config.started_at) % config.burst_every
+            if phase < config.burst_length:
+                return web.Response(status=503, text="Service Unavailable")
+        if config.random.random() < config.error_rate:
+            return web.Response(status=config.random.choice([500, 502, 503, 504]))
+
+        try:
+            start = datetime.strptime(form["startdate"], "%Y%m%d").date()
+            end = datetime.strptime(form["enddate"], "%Y%m%d").date()
+        except (KeyError, ValueError):
+            return web.json_response([])
+
+        return web.json_response(
+            build_rows(form.get("locid", ""), start, end, config.empty_rate)
+        )
+
+    app = web.Application()
+    app.router.add_post(PLINECHART_PATH, plinechart)
+    return app
+
+
+def start_in_thread(config, host="127.0.0.1", port=0):
+    # Jalankan mock di thread daemon; return URL endpoint (port 0 = pilih bebas)
+    ready = threading.Event()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    url = f"http://{host}:{sock.getsockname()[1]}{PLINECHART_PATH}?"
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(create_app(config))
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.SockSite(runner, sock).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="mock-wifi-id", daemon=True).start()
+    ready.wait()
+    return url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock server endpoint wifi.id")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="detik")
+    parser.add_argument("--jitter", type=float, default=0.1, help="detik (+/-)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0, help="detik")
+    parser.add_argument("--burst-length", type=float, default=0.0, help="detik")
+    parser.add_argument("--valid-session", help="PHPSESSID lain ditolak")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        empty_rate=args.empty_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        valid_session=args.valid_session,
+        seed=args.seed,
+    )
+    print(f"Mock wifi.id: http://{args.host}:{args.port}{PLINECHART_PATH}?")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import spawn
+from multiprocessing.context import SpawnContext, SpawnProcess
+
+import metrics
+
+# --- RENDER POOL (PNG) ---
+# Rasterisasi chart (kaleido) adalah langkah paling lambat di bulk download.
+# Render dipisah dari fetch: ada pool proses renderer yang hidup terus
+# (1 per core, browser kaleido tetap hidup di tiap proses), menerima spec
+# figure (dict) per batch dan mengembalikan bytes PNG.
+# Pool baru dinyalakan saat bulk ZIP pertama, bukan saat server start: tiap
+# proses membawa satu Chrome, terlalu mahal untuk user yang cuma buka Tab 1.
+#
+# Jumlah proses = core yang boleh dipakai proses ini (sched_getaffinity, bukan
+# os.cpu_count() yang menghitung semua core host). Limit CPU cgroup (docker
+# --cpus) tidak terlihat dari sini, jadi bisa di-override lewat env
+# RENDER_WORKERS.
+
+PNG_WIDTH = 1400
+PNG_HEIGHT = 700
+PNG_SCALE = 2
+RENDER_BATCH_SIZE = 4
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "0"))  # 0 = otomatis
+
+
+def default_workers():
+    if RENDER_WORKERS > 0:
+        return RENDER_WORKERS
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker():
+    # Jalan sekali per proses renderer: render figure kecil dulu (cek kaleido
+    # & Chrome ada), baru nyalakan server kaleido persisten (kaleido v1+)
+    # supaya browser tidak dibuka-tutup untuk setiap chart.
+    import plotly.io as pio
+
+    try:
+        pio.to_image({"data": [], "layout": {}}, format="png", width=10, height=10)
+        import kaleido
+
+        if hasattr(kaleido, "start_sync_server"):
+            kaleido.start_sync_server(silence_warnings=True)
+    except Exception:
+        # Error render beneran akan muncul per figure di _render_batch
+        pass
+
+
+def _render_batch(specs):
+    # -> list (bytes PNG / Exception, detik render); waktu diukur di worker
+    # supaya metrics di proses utama tidak ikut menghitung antrian pool
+    import plotly.io as pio
+
+    results = []
+    for spec in specs:
+        started = time.perf_counter()
+        try:
+            image = pio.to_image(
+                spec,
+                format="png",
+                width=PNG_WIDTH,
+                height=PNG_HEIGHT,
+                scale=PNG_SCALE,
+                validate=False,
+            )
+        except Exception as exc:
+            image = exc
+        results.append((image, time.perf_counter() - started))
+    return results
+
+
+# --- PROSES WORKER TANPA __main__ ---
+# spawn biasanya menjalankan ulang modul __main__ proses induk di tiap worker.
+# Di Streamlit __main__ = app.py, jadi tiap worker ikut meng-import seluruh
+# dashboard (streamlit, pandas, setup DB) cuma untuk pio.to_image. Worker
+# renderer cukup modul ini: _render_batch / _init_worker di-unpickle lewat
+# nama modul "renderer", jadi data persiapan main dibuang untuk proses ini saja.
+WORKER_NAME = "png-renderer"
+
+
+class _WorkerProcess(SpawnProcess):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = f"{WORKER_NAME}-{self._identity[-1]}"
+
+
+class _WorkerContext(SpawnContext):
+    Process = _WorkerProcess
+
+
+def _preparation_data(name, _original=spawn.get_preparation_data):
+    data = _original(name)
+    if name.startswith(WORKER_NAME):
+        data.pop("init_main_from_path", None)
+        data.pop("init_main_from_name", None)
+    return data
+
+
+spawn.get_preparation_data = _preparation_data
+
+
+class RenderPool:
+    def __init__(self, workers=None):
+        self.workers = workers or default_workers()
+        # spawn (bukan fork): proses Streamlit punya banyak thread
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_WorkerContext(),
+            initializer=_init_worker,
+        )
+
+    def submit_batch(self, specs):
+        # Future -> list (bytes PNG atau Exception, detik), urutan sama dengan specs
+        return self._executor.submit(_render_batch, list(specs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    # Satu pool per proses server, dipakai bersama semua session & run
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool()
+        return _pool
+
+
+def warm_up():
+    # Nyalakan semua proses renderer (+ kaleido) sekarang, tanpa menunggu,
+    # supaya startup kaleido jalan bersamaan dengan preflight & fetch
+    pool = get_render_pool()
+    for _ in range(pool.workers):
+        pool.submit_batch([])
+
+
+def reset_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+class RenderQueue:
+    # Antrian render untuk satu run bulk: spec dikumpulkan per batch lalu
+    # dikirim ke pool; hasil diambil non-blocking selama fetch masih jalan.
+    def __init__(self, pool, batch_size=RENDER_BATCH_SIZE):
+        self.pool = pool
+        self.batch_size = batch_size
+        self._buffer = []
+        self._pending = {}
+
+    def add(self, item, spec):
+        self._buffer.append((item, spec))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        items = [item for item, _ in self._buffer]
+        future = self.pool.submit_batch([spec for _, spec in self._buffer])
+        self._pending[future] = items
+        self._buffer = []
+
+    def _collect(self, futures):
+        for future in futures:
+            items = self._pending.pop(future)
+            try:
+                images = []
+                for image, seconds in future.result():
+                    metrics.observe("stage_seconds", seconds, stage="render")
+                    images.append(image)
+            except BrokenProcessPool as exc:
+                # Proses renderer mati (OOM / crash): pool dibuat ulang untuk run berikutnya
+                reset_render_pool()
+                images = [exc] * len(items)
+            except Exception as exc:
+                images = [exc] * len(items)
+            for item, image in zip(items, images):
+                yield item, image
+
+    def ready(self):
+        # (item, bytes PNG / Exception) untuk batch yang sudah selesai, tanpa menunggu
+        done = [f for f in self._pending if f.done()]
+        yield from self._collect(done)
+
+    def finish(self):
+        # Kirim sisa buffer lalu tunggu semua batch selesai
+        self.flush()
+        while self._pending:
+            done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+            yield from self._collect(done)
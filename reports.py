@@ -0,0 +1,536 @@
+import os
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+import fetch_engine
+import html_report
+import jobs
+import metrics
+import renderer
+import usage_series
+import wifi_api
+from charts import create_chart
+from config import PROJECT_CONFIG
+from database import load_from_db
+from summary import SUMMARY_COLUMNS, SummaryCollector
+
+# --- PIPELINE LAPORAN (BULK ZIP & SUMMARY) ---
+# Dipakai oleh dashboard (Tab 2 / Tab 3) dan CLI batch, tanpa Streamlit.
+# Progress dilaporkan lewat callback on_progress(done, total).
+
+ERROR_LOG_NAME = jobs.ERROR_LOG_NAME
+
+# File hasil run interaktif (sementara) vs hasil CLI terjadwal (disimpan)
+REPORT_DIR = os.path.join(tempfile.gettempdir(), "wifi_dashboard_reports")
+REPORT_TTL = 6 * 3600  # File hasil lebih tua dari 6 jam dihapus
+ARTIFACT_DIR = "reports"
+# Jeda minimal antar snapshot hasil sementara summary (on_partial), supaya
+# summarize() tidak jalan per lokasi dan loop fetch tidak ikut melambat
+PARTIAL_INTERVAL = 1.0
+
+
+def new_report_path(suffix):
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    # Bersihkan file hasil run lama supaya disk container tidak penuh
+    now = time.time()
+    for name in os.listdir(REPORT_DIR):
+        path = os.path.join(REPORT_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > REPORT_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=REPORT_DIR)
+    os.close(fd)
+    return path
+
+
+def read_report(path):
+    # Batasan Streamlit: st.download_button tidak bisa streaming dari disk, isi
+    # file selalu disalin utuh ke media storage (RAM) selama session masih
+    # terbuka. Dengan data=callable, salinan itu baru dibuat saat tombol diklik
+    # (bukan tiap rerun). Untuk laporan yang sangat besar pakai CLI, hasilnya
+    # langsung di folder reports/.
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def clean_filename(text):
+    return "".join([c if c.isalnum() else "_" for c in text])
+
+
+def artifact_path(project_name, start_date, end_date, kind, suffix):
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    name = f"{clean_filename(project_name)}_{start_date:%Y%m%d}-{end_date:%Y%m%d}_{kind}{suffix}"
+    return os.path.join(ARTIFACT_DIR, name)
+
+
+def list_artifacts(project_name):
+    # Hasil CLI terjadwal untuk satu proyek, terbaru di atas
+    if not os.path.isdir(ARTIFACT_DIR):
+        return []
+    prefix = f"{clean_filename(project_name)}_"
+    paths = [
+        os.path.join(ARTIFACT_DIR, name)
+        for name in os.listdir(ARTIFACT_DIR)
+        if name.startswith(prefix)
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+# --- HELPER: BULK PROCESSOR & SUMMARY ---
+# df = hasil fetch (dari fetch_engine), None kalau gagal fetch
+def process_single_location(
+    row_data, df, s_date, e_date, reason=None, granularity=usage_series.DAILY
+):
+    loc_id = row_data["LOC_ID"]
+    loc_name = row_data["SITE_NAME"]
+
+    # CASE ERROR: Jika data None (Gagal Fetch / dilewati circuit breaker)
+    if df is None:
+        reason = reason or wifi_api.UPSTREAM_DOWN
+        return {
+            "status": "skipped" if reason.startswith("Skipped") else "error",
+            "name": loc_name,
+            "id": loc_id,
+            "reason": reason,
+        }
+
+    # CASE EMPTY: Jika data Kosong (Zonk)
+    if df.empty:
+        return {
+            "status": "empty",
+            "name": loc_name,
+            "id": loc_id,
+            "reason": wifi_api.NO_DATA,
+        }
+
+    # SUKSES FETCH
+    total_usage = df["total_usage_gb"].sum()
+
+    # Buat Chart
+    title_html = f"<b>{loc_name} ({loc_id})</b><br><span style='font-size: 16px; color: gray;'>{s_date.strftime('%d/%m/%Y')} - {e_date.strftime('%d/%m/%Y')}</span>"
+    # Render PNG tidak di sini lagi: spec figure dikirim ke render pool
+    figure_spec = create_chart(df, title_html, granularity)
+
+    filename = f"{clean_filename(loc_name)}_{loc_id}.png"
+
+    return {
+        "status": "success",
+        "filename": filename,
+        "figure": figure_spec,
+        "loc_id": loc_id,
+        "site_name": loc_name,
+        "total_usage": total_usage,
+    }
+
+
+def _rows_by_id(locations):
+    return {row["LOC_ID"]: row for _, row in locations.iterrows()}
+
+
+def preflight(session_id, vo_id, loc_ids, end_date):
+    # Cek session sekali (lokasi pertama, hari terakhir periode) sebelum
+    # ratusan request dikirim. Session invalid / wifi.id down -> FetchError.
+    loc_id = next(iter(loc_ids), None)
+    if loc_id is None:
+        return
+    reason = wifi_api.check_session(session_id, vo_id, loc_id, end_date)
+    if reason == wifi_api.SESSION_INVALID:
+        raise wifi_api.FetchError(
+            reason, "PHPSESSID kadaluarsa / salah, login ulang lalu salin lagi"
+        )
+    if reason:
+        raise wifi_api.FetchError(reason, "server wifi.id tidak merespons")
+
+
+def _count_failure(failures, series, reason):
+    # Lokasi yang tidak masuk rekap, dikelompokkan per alasan
+    if series is None:
+        failures[reason or wifi_api.UPSTREAM_DOWN] += 1
+    elif series.empty:
+        failures[wifi_api.NO_DATA] += 1
+
+
+def format_failures(failures):
+    # {"Session Invalid": 3, ...} -> "Session Invalid: 3, ..."
+    return ", ".join(f"{reason}: {count}" for reason, count in failures.most_common())
+
+
+def run_bulk_report(
+    db_path,
+    project_name,
+    session_id,
+    vo_id,
+    locations,
+    start_date,
+    end_date,
+    zip_path,
+    controller=None,
+    on_progress=None,
+    fresh=False,
+    granularity=usage_series.AUTO,
+):
+    # Checkpoint per lokasi ke job (jobs.py): lokasi yang sudah sukses di run
+    # sebelumnya tidak di-fetch / di-render ulang. Data di-fetch harian lalu
+    # diringkas per granularitas sebelum jadi chart.
+    granularity = usage_series.resolve_granularity(granularity, start_date, end_date)
+    job_id = jobs.open_bulk_job(
+        db_path,
+        project_name,
+        vo_id,
+        locations,
+        start_date,
+        end_date,
+        fresh=fresh,
+        granularity=granularity,
+    )
+    rows_by_id = _rows_by_id(locations)
+    todo = jobs.todo_locations(db_path, job_id)
+    todo_ids = [loc_id for loc_id in rows_by_id if str(loc_id) in todo]
+    preflight(session_id, vo_id, todo_ids, end_date)
+    if todo_ids:
+        # Session sudah terbukti valid & ada yang perlu di-render: nyalakan
+        # proses kaleido sekarang, startup-nya jalan bersamaan dengan fetch
+        renderer.warm_up()
+    total = len(rows_by_id)
+    already_done = total - len(todo_ids)
+    render_queue = renderer.RenderQueue(renderer.get_render_pool())
+
+    def save_rendered(rendered):
+        for res, img_data in rendered:
+            if isinstance(img_data, Exception):
+                jobs.checkpoint_failure(
+                    db_path,
+                    job_id,
+                    res["loc_id"],
+                    "error",
+                    f"Render Failed ({type(img_data).__name__})",
+                )
+            else:
+                jobs.checkpoint_success(
+                    db_path, job_id, res["loc_id"], res["filename"], img_data
+                )
+
+    if on_progress:
+        on_progress(already_done, total)
+
+    for i, (loc_id, series, reason) in enumerate(
+        fetch_engine.fetch_many(
+            db_path,
+            session_id,
+            vo_id,
+            todo_ids,
+            start_date,
+            end_date,
+            controller=controller,
+            as_series=True,
+        )
+    ):
+        df_res = None
+        if series is not None:
+            with metrics.timed("frame"):
+                df_res = series.resample(granularity).to_frame()
+        res = process_single_location(
+            rows_by_id[loc_id], df_res, start_date, end_date, reason, granularity
+        )
+        if on_progress:
+            on_progress(already_done + i + 1, total)
+
+        if res["status"] == "success":
+            render_queue.add(res, res.pop("figure"))
+        else:
+            # Catat Error
+            jobs.checkpoint_failure(
+                db_path, job_id, loc_id, res["status"], res["reason"]
+            )
+
+        save_rendered(render_queue.ready())
+
+    save_rendered(render_queue.finish())
+
+    # ZIP disusun dari checkpoint di disk (termasuk hasil run-run sebelumnya)
+    result = jobs.finish_job(
+        db_path, job_id, project_name, list(rows_by_id.keys()), zip_path
+    )
+    result["resumed_count"] = already_done
+    return result
+
+
+def run_html_report(
+    db_path,
+    project_name,
+    session_id,
+    vo_id,
+    locations,
+    start_date,
+    end_date,
+    html_path,
+    controller=None,
+    on_progress=None,
+    granularity=usage_series.AUTO,
+):
+    # Bulk versi satu file HTML (chart vektor, tanpa render PNG). Tanpa
+    # checkpoint: run ulang cukup murah karena data sudah ada di usage_store.
+    granularity = usage_series.resolve_granularity(granularity, start_date, end_date)
+    rows_by_id = _rows_by_id(locations)
+    preflight(session_id, vo_id, rows_by_id, end_date)
+    writer = html_report.HtmlReportWriter(
+        html_path,
+        f"Laporan Wifi.id: {project_name}",
+        f"{start_date:%d/%m/%Y} - {end_date:%d/%m/%Y}",
+    )
+    error_logs = []
+    failures = Counter()
+    try:
+        for i, (loc_id, series, reason) in enumerate(
+            fetch_engine.fetch_many(
+                db_path,
+                session_id,
+                vo_id,
+                list(rows_by_id.keys()),
+                start_date,
+                end_date,
+                controller=controller,
+                as_series=True,
+            )
+        ):
+            df_res = None
+            if series is not None:
+                with metrics.timed("frame"):
+                    df_res = series.resample(granularity).to_frame()
+            res = process_single_location(
+                rows_by_id[loc_id], df_res, start_date, end_date, reason, granularity
+            )
+            if on_progress:
+                on_progress(i + 1, len(rows_by_id))
+
+            if res["status"] == "success":
+                writer.add_chart(
+                    loc_id, res["site_name"], res["figure"], res["total_usage"]
+                )
+            else:
+                error_logs.append(
+                    f"[{res['status'].upper()}] {res['name']} ({loc_id}): {res['reason']}"
+                )
+                failures[res["reason"]] += 1
+    except BaseException:
+        writer.abort()
+        raise
+
+    writer.finish(sorted(error_logs), failures)
+    return {
+        "html_path": html_path,
+        "success_count": len(writer.entries),
+        "error_logs": error_logs,
+        "failures": failures,
+    }
+
+
+def run_summary_report(
+    db_path,
+    session_id,
+    vo_id,
+    locations,
+    start_date,
+    end_date,
+    controller=None,
+    on_progress=None,
+    on_partial=None,
+):
+    # on_partial(df_sementara): dipanggil berkala selama fetch berjalan
+    rows_by_id = _rows_by_id(locations)
+    preflight(session_id, vo_id, rows_by_id, end_date)
+    site_names = {loc_id: row["SITE_NAME"] for loc_id, row in rows_by_id.items()}
+    collector = SummaryCollector()
+    failures = Counter()
+    last_partial = time.monotonic()
+    partial_count = 0
+
+    # Fetch data saja (Tanpa generate gambar biar cepat), hasil berupa
+    # UsageSeries yang dikumpulkan; agregat dihitung sekali di akhir
+    for i, (loc_id, series, reason) in enumerate(
+        fetch_engine.fetch_many(
+            db_path,
+            session_id,
+            vo_id,
+            list(rows_by_id.keys()),
+            start_date,
+            end_date,
+            controller=controller,
+            as_series=True,
+        )
+    ):
+        if on_progress:
+            on_progress(i + 1, len(rows_by_id))
+        _count_failure(failures, series, reason)
+        collector.add(loc_id, series)
+
+        if (
+            on_partial
+            and len(collector) > partial_count
+            and time.monotonic() - last_partial >= PARTIAL_INTERVAL
+        ):
+            df_partial = collector.summarize(site_names)
+            df_partial.attrs["failures"] = Counter(failures)
+            on_partial(df_partial)
+            partial_count = len(collector)
+            last_partial = time.monotonic()
+
+    df_summary = collector.summarize(site_names)
+    # Rincian lokasi yang tidak masuk rekap, dibaca UI / CLI
+    df_summary.attrs["failures"] = failures
+    return df_summary
+
+
+def run_all_projects_summary(
+    db_path,
+    project_sessions,
+    start_date,
+    end_date,
+    controller=None,
+    on_progress=None,
+):
+    # Rekap semua proyek dalam satu run fetch (satu engine, satu limit
+    # concurrency). Lokasi yang sama (vo_id + loc_id) di beberapa proyek hanya
+    # di-fetch sekali. project_sessions: dict proyek -> session_id; proyek
+    # tanpa session / session gagal preflight dilewati.
+    members = []  # (proyek, key, loc_id)
+    projects_by_key = {}
+    site_names = {}
+    requests = {}
+    skipped = []
+    invalid_sessions = {}  # proyek -> alasan preflight gagal
+    for project_name, config in PROJECT_CONFIG.items():
+        locations = load_from_db(project_name, db_path)
+        if locations.empty:
+            continue
+        session_id = project_sessions.get(project_name)
+        if not session_id:
+            skipped.append(project_name)
+            continue
+        vo_id = config["vo_id"]
+        try:
+            preflight(session_id, vo_id, locations["LOC_ID"], end_date)
+        except wifi_api.FetchError as exc:
+            invalid_sessions[project_name] = exc.reason
+            continue
+        for _, row in locations.iterrows():
+            key = f"{vo_id}|{row['LOC_ID']}"
+            members.append((project_name, key, row["LOC_ID"]))
+            projects_by_key.setdefault(key, set()).add(project_name)
+            site_names.setdefault(key, row["SITE_NAME"])
+            if key not in requests:
+                requests[key] = fetch_engine.FetchRequest(
+                    session_id, vo_id, row["LOC_ID"], start_date, end_date
+                )
+
+    collector = SummaryCollector()
+    failures = Counter()
+    engine = fetch_engine.FetchEngine(db_path, controller=controller, as_series=True)
+    for i, (req, series) in enumerate(
+        fetch_engine.iter_results(engine, list(requests.values()))
+    ):
+        if on_progress:
+            on_progress(i + 1, len(requests))
+        _count_failure(failures, series, engine.failure(req))
+        collector.add(f"{req.vo_id}|{req.loc_id}", series)
+
+    result = {
+        "summary": pd.DataFrame(),
+        "subtotals": pd.DataFrame(),
+        "total_usage_gb": 0.0,
+        "unique_locations": len(requests),
+        # Lokasi yang terdaftar di lebih dari satu proyek (cukup di-fetch sekali)
+        "shared_locations": sum(
+            len(projects) > 1 for projects in projects_by_key.values()
+        ),
+        "skipped_projects": skipped,
+        "invalid_sessions": invalid_sessions,
+        "failures": failures,
+    }
+    by_key = collector.summarize(site_names)
+    if by_key.empty:
+        return result
+
+    # Satu baris per (proyek, lokasi); lokasi bersama muncul di tiap proyeknya
+    membership = pd.DataFrame(members, columns=["Proyek", "key", "LOC ID"])
+    membership = membership.drop_duplicates(["Proyek", "key"])
+    df_all = membership.merge(
+        by_key.rename(columns={"LOC ID": "key"}), on="key", how="inner"
+    )
+    df_all = df_all[["Proyek"] + SUMMARY_COLUMNS].sort_values(
+        "Total Usage (GB)", ascending=False, kind="stable"
+    )
+
+    subtotals = (
+        df_all.groupby("Proyek", sort=False)
+        .agg(
+            **{
+                "Lokasi Aktif": ("LOC ID", "size"),
+                "Total Usage (GB)": ("Total Usage (GB)", "sum"),
+                "Peak User": ("Peak User", "max"),
+            }
+        )
+        .join(membership.groupby("Proyek").size().rename("Total Lokasi"))
+        .reset_index()
+        .sort_values("Total Usage (GB)", ascending=False)
+    )
+    subtotals["Total Usage (GB)"] = subtotals["Total Usage (GB)"].round(2)
+
+    result.update(
+        summary=df_all,
+        subtotals=subtotals,
+        # Total provinsi dari lokasi unik (lokasi bersama tidak dihitung dua kali)
+        total_usage_gb=float(by_key["Total Usage (GB)"].sum()),
+    )
+    return result
+
+
+# --- ADAPTER UNTUK BACKGROUND JOB (background.py) ---
+def bulk_report_job(job, *args, controller=None, **kwargs):
+    # File ZIP baru dibuat saat job benar-benar jalan (bukan saat menempel)
+    job.controller = controller
+    result = run_bulk_report(
+        *args,
+        new_report_path(".zip"),
+        controller=controller,
+        on_progress=job.set_progress,
+        **kwargs,
+    )
+    job.artifact_path = result["zip_path"]
+    return result
+
+
+def html_report_job(job, *args, controller=None, **kwargs):
+    job.controller = controller
+    result = run_html_report(
+        *args,
+        new_report_path(".html"),
+        controller=controller,
+        on_progress=job.set_progress,
+        **kwargs,
+    )
+    job.artifact_path = result["html_path"]
+    return result
+
+
+def summary_report_job(job, *args, controller=None, **kwargs):
+    job.controller = controller
+    return run_summary_report(
+        *args,
+        controller=controller,
+        on_progress=job.set_progress,
+        on_partial=job.set_partial,
+        **kwargs,
+    )
+
+
+def all_projects_summary_job(job, *args, controller=None, **kwargs):
+    job.controller = controller
+    return run_all_projects_summary(
+        *args, controller=controller, on_progress=job.set_progress, **kwargs
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# --- SINGLE-FLIGHT (REQUEST COALESCING) ---
+# Kalau ada beberapa request identik (vo_id, loc_id, periode) di waktu yang
+# sama -- dari user lain, Tab 1, atau job summary -- hanya satu yang benar-benar
+# ke wifi.id. Sisanya menunggu & memakai hasil yang sama.
+# Bisa dipakai dari thread biasa (do) maupun event loop asyncio (do_async),
+# karena hasil dibagikan lewat concurrent.futures.Future yang thread-safe.
+#
+# Yang dibagikan hanya hasil sukses dan error yang sama untuk semua orang
+# (share_error(exc) -> True, misalnya wifi.id down). Kalau leader gagal karena
+# alasan miliknya sendiri (dibatalkan, breaker engine-nya putus, session-nya
+# kadaluarsa), follower tidak ikut gagal: mereka join ulang dan salah satunya
+# jadi leader baru dengan fn miliknya sendiri.
+
+STATS_MAX_KEYS = 5000
+
+
+class _LeaderFailed(Exception):
+    # Sinyal internal ke follower: join ulang, jangan pakai hasil leader
+    pass
+
+
+def _share_all(exc):
+    return True
+
+
+class SingleFlight:
+    def __init__(self, max_keys=STATS_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = OrderedDict()
+        self.total_calls = 0
+        self.total_shared = 0
+
+    def _join(self, key, rejoin=False):
+        # -> (future, is_leader); rejoin=True tidak dihitung sebagai call baru
+        with self._lock:
+            stats = self._stats.pop(key, None) or {"calls": 0, "shared": 0}
+            self._stats[key] = stats
+            if len(self._stats) > self.max_keys:
+                self._stats.popitem(last=False)
+
+            if not rejoin:
+                stats["calls"] += 1
+                self.total_calls += 1
+            future = self._calls.get(key)
+            if future is not None:
+                if not rejoin:
+                    stats["shared"] += 1
+                    self.total_shared += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key, future, result=None, exc=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if exc is None:
+            future.set_result(result)
+        else:
+            future.set_exception(exc)
+
+    def _fail(self, key, future, exc, share_error):
+        if isinstance(exc, Exception) and share_error(exc):
+            self._finish(key, future, exc=exc)
+        else:
+            # CancelledError / KeyboardInterrupt juga tidak diteruskan
+            self._finish(key, future, exc=_LeaderFailed(key))
+
+    def do(self, key, fn, share_error=_share_all):
+        future, is_leader = self._join(key)
+        while not is_leader:
+            try:
+                return future.result()
+            except _LeaderFailed:
+                future, is_leader = self._join(key, rejoin=True)
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._fail(key, future, exc, share_error)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key, coro_fn, share_error=_share_all):
+        future, is_leader = self._join(key)
+        while not is_leader:
+            try:
+                return await asyncio.wrap_future(future)
+            except _LeaderFailed:
+                future, is_leader = self._join(key, rejoin=True)
+
+        try:
+            result = await coro_fn()
+        except BaseException as exc:
+            self._fail(key, future, exc, share_error)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self, top=20):
+        with self._lock:
+            keys = sorted(
+                self._stats.items(), key=lambda item: item[1]["shared"], reverse=True
+            )
+            return {
+                "calls": self.total_calls,
+                "shared": self.total_shared,
+                "in_flight": len(self._calls),
+                "top_keys": [(key, dict(stats)) for key, stats in keys[:top]],
+            }
+
+
+# Dipakai bersama oleh fetch sync (Tab 1) dan fetch_engine (bulk / summary)
+usage_flight = SingleFlight()
+
+
+def usage_key(vo_id, loc_id, start_date, end_date):
+    # Tanpa session_id: data lokasi sama untuk siapa pun yang login
+    return (str(vo_id), str(loc_id), start_date.isoformat(), end_date.isoformat())
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+
+# --- KONEKSI SQLITE (DIPAKAI ULANG) ---
+# Per file DB, seluruh proses memakai dua koneksi yang dibuka sekali lalu
+# dipakai terus oleh semua thread (rerun Streamlit, job background, event loop
+# fetch), bukan satu koneksi baru per thread:
+# - koneksi tulis: dipakai di dalam "with conn:", satu transaksi per waktu
+#   (lock dipegang sampai commit / rollback), jadi statement thread lain tidak
+#   ikut masuk ke transaksi yang sedang jalan
+# - koneksi baca (query_only): semua statement di luar "with conn:". Berkat
+#   WAL, pembaca tidak menunggu transaksi tulis yang sedang jalan.
+#
+# Jadi tulis selalu lewat "with conn:" (commit / rollback otomatis); statement
+# tulis di luarnya ditolak SQLite ("attempt to write a readonly database").
+
+BUSY_TIMEOUT = 10  # detik menunggu lock tulis sebelum "database is locked"
+
+
+class _SharedConnection(sqlite3.Connection):
+    # Koneksi tulis; statement di luar "with conn:" diteruskan ke self.reader
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+        self.reader = None
+        self._local = threading.local()  # kedalaman "with conn:" per thread
+
+    def _writing(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    def cursor(self, factory=sqlite3.Cursor):
+        # pandas.read_sql_query juga lewat sini
+        if self._writing():
+            return super().cursor(factory)
+        return self.reader.cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def __enter__(self):
+        self.lock.acquire()
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self._local.depth -= 1
+            self.lock.release()
+
+    def close(self):
+        self.reader.close()
+        super().close()
+
+
+_conns = {}
+_conns_pid = None
+_conns_lock = threading.Lock()
+
+
+def _open(db_path):
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT,
+        factory=_SharedConnection,
+        check_same_thread=False,
+    )
+    with conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Aman untuk WAL, jauh lebih cepat
+    conn.reader = sqlite3.connect(
+        db_path, timeout=BUSY_TIMEOUT, check_same_thread=False
+    )
+    conn.reader.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def get_connection(db_path):
+    global _conns, _conns_pid
+    with _conns_lock:
+        # Setelah fork, koneksi milik proses induk tidak boleh dipakai
+        if _conns_pid != os.getpid():
+            _conns = {}
+            _conns_pid = os.getpid()
+        conn = _conns.get(db_path)
+        if conn is None:
+            conn = _conns[db_path] = _open(db_path)
+        return conn
+
+
+def close_connections():
+    # Tutup semua koneksi proses ini (misal di akhir CLI / test)
+    global _conns
+    with _conns_lock:
+        for conn in _conns.values():
+            conn.close()
+        _conns = {}
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from usage_series import BYTES_PER_GB
+
+# --- SUMMARY ENGINE (KOLOMNAR & VEKTORISASI) ---
+# Data harian semua lokasi dikumpulkan jadi satu set kolom (lokasi, hari,
+# user, bytes), lalu semua agregat dihitung sekali jalan dengan numpy
+# (bincount / reduceat), bukan sum() / mean() per DataFrame kecil per lokasi.
+# Puluhan ribu lokasi-hari selesai dalam hitungan milidetik.
+
+SUMMARY_COLUMNS = [
+    "Kecamatan/Lokasi",
+    "LOC ID",
+    "Total Usage (GB)",
+    "Rata-rata (GB)",
+    "Peak User",
+    "Hari Aktif",
+    "Growth Harian (%)",
+]
+
+
+class SummaryCollector:
+    def __init__(self):
+        self.loc_ids = []
+        self._loc_index = []
+        self._days = []
+        self._users = []
+        self._bytes = []
+
+    def add(self, loc_id, series):
+        # Lokasi gagal / tanpa data tidak ikut rekap (sama seperti sebelumnya)
+        if series is None or series.empty:
+            return
+        self._loc_index.append(np.full(len(series), len(self.loc_ids), dtype=np.int32))
+        self.loc_ids.append(loc_id)
+        self._days.append(series.days)
+        self._users.append(series.users)
+        self._bytes.append(series.usage_bytes)
+
+    def __len__(self):
+        return len(self.loc_ids)
+
+    def columns(self):
+        # -> (loc_index, days, users, usage_bytes), urut per lokasi lalu per hari
+        if not self.loc_ids:
+            empty = np.array([], dtype=np.int32)
+            return empty, empty, empty, np.array([], dtype=np.int64)
+        loc_index = np.concatenate(self._loc_index)
+        days = np.concatenate(self._days)
+        users = np.concatenate(self._users)
+        usage = np.concatenate(self._bytes)
+        order = np.lexsort((days, loc_index))
+        return loc_index[order], days[order], users[order], usage[order]
+
+    def summarize(self, site_names=None):
+        # site_names: dict loc_id -> nama lokasi. Return DataFrame urut Total Usage.
+        if not self.loc_ids:
+            return pd.DataFrame()
+        site_names = site_names or {}
+        loc_index, _, users, usage = self.columns()
+        n = len(self.loc_ids)
+
+        day_count = np.bincount(loc_index, minlength=n)
+        total_bytes = np.bincount(loc_index, weights=usage, minlength=n)
+        active_days = np.bincount(loc_index, weights=usage > 0, minlength=n)
+
+        # Awal tiap grup lokasi (data sudah urut per lokasi)
+        starts = np.flatnonzero(np.r_[True, loc_index[1:] != loc_index[:-1]])
+        peak_users = np.maximum.reduceat(users, starts)
+
+        # Growth harian: rata-rata % perubahan usage hari ke hari dalam satu lokasi
+        prev, cur = usage[:-1], usage[1:]
+        same_loc = (loc_index[1:] == loc_index[:-1]) & (prev > 0)
+        pct = (cur[same_loc] - prev[same_loc]) / prev[same_loc] * 100
+        growth_idx = loc_index[1:][same_loc]
+        growth_sum = np.bincount(growth_idx, weights=pct, minlength=n)
+        growth_count = np.bincount(growth_idx, minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            growth = np.where(growth_count > 0, growth_sum / growth_count, 0.0)
+
+        total_gb = total_bytes / BYTES_PER_GB
+        names = [site_names.get(loc_id, "") for loc_id in self.loc_ids]
+        df = pd.DataFrame(
+            {
+                "Kecamatan/Lokasi": names,
+                "LOC ID": self.loc_ids,
+                "Total Usage (GB)": np.round(total_gb, 2),
+                "Rata-rata (GB)": np.round(total_gb / day_count, 2),
+                "Peak User": peak_users,
+                "Hari Aktif": active_days.astype(int),
+                "Growth Harian (%)": np.round(growth, 1),
+            },
+            columns=SUMMARY_COLUMNS,
+        )
+        return df.sort_values("Total Usage (GB)", ascending=False, kind="stable")
+
+
+def top_n(df_summary, n=10, by="Total Usage (GB)"):
+    if df_summary.empty:
+        return df_summary
+    return df_summary.nlargest(n, by, keep="first")
@@ -0,0 +1,50 @@
+import random
+
+from concurrency import AimdController
+
+
+def run_round(controller, results):
+    for ok in results:
+        controller.on_result(0.1, ok)
+
+
+def test_error_mid_round_decreases():
+    controller = AimdController(initial=8)
+    run_round(controller, [True, True, True, False])
+    assert controller.limit == 4
+
+
+def test_one_decrease_per_round():
+    controller = AimdController(initial=16)
+    run_round(controller, [False] * 6)
+    assert controller.limit == 8
+
+
+def test_clean_round_increases():
+    controller = AimdController(initial=8)
+    run_round(controller, [True] * 8)
+    assert controller.limit == 9
+
+
+def test_congested_round_does_not_increase():
+    controller = AimdController(initial=8)
+    run_round(controller, [False])  # limit 4, putaran baru
+    run_round(controller, [True, False, True, True])  # sudah turun sekali
+    assert controller.limit == 4
+    run_round(controller, [True] * 4)
+    assert controller.limit == 5
+
+
+def test_slow_result_decreases():
+    controller = AimdController(initial=8)
+    run_round(controller, [True] * 8)
+    controller.on_result(30.0, True)
+    assert controller.limit == 4
+
+
+def test_steady_error_rate_keeps_limit_low():
+    rng = random.Random(1)
+    controller = AimdController()
+    for _ in range(5000):
+        controller.on_result(0.1, rng.random() >= 0.1)
+    assert controller.limit <= 8
@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+import database
+from importer import LocationImportError, import_locations
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    database.init_db(path)
+    return path
+
+
+def test_csv_import_skips_invalid_and_duplicate_rows(db_path):
+    stats = import_locations(
+        csv_file("LOC_ID;NAMA_LOKASI\n101;Kec A\n102;Kec B\n101;Kec A lagi\n;Kosong\n"),
+        "lokasi.csv",
+        "P",
+        db_path,
+    )
+    assert stats["rows"] == 4
+    assert stats["imported"] == 2
+    assert stats["duplicates"] == 1
+    assert stats["invalid"] == 1
+    assert stats["added"] == 2
+    df = database.load_from_db("P", db_path)
+    assert df["LOC_ID"].tolist() == ["101", "102"]
+    assert df["SITE_NAME"].tolist() == ["Kec A", "Kec B"]
+
+
+def test_reimport_writes_only_the_diff(db_path):
+    import_locations(
+        csv_file("LOC_ID,NAMA\n101,Kec A\n102,Kec B\n103,Kec C\n"),
+        "lokasi.csv",
+        "P",
+        db_path,
+    )
+    import_locations(
+        csv_file("LOC_ID,NAMA\n1,Lain\n"), "lain.csv", "Proyek Lain", db_path
+    )
+    stats = import_locations(
+        csv_file("LOC_ID,NAMA\n101,Kec A\n102,Kec B Baru\n104,Kec D\n"),
+        "lokasi.csv",
+        "P",
+        db_path,
+    )
+    assert (stats["added"], stats["removed"], stats["renamed"]) == (1, 1, 1)
+    df = database.load_from_db("P", db_path)
+    assert dict(zip(df["LOC_ID"], df["SITE_NAME"])) == {
+        "101": "Kec A",
+        "102": "Kec B Baru",
+        "104": "Kec D",
+    }
+    # Proyek lain tidak tersentuh
+    assert database.load_from_db("Proyek Lain", db_path)["LOC_ID"].tolist() == ["1"]
+
+
+def test_wrong_format_keeps_existing_locations(db_path):
+    import_locations(csv_file("LOC_ID,NAMA\n101,Kec A\n"), "lokasi.csv", "P", db_path)
+    with pytest.raises(LocationImportError):
+        import_locations(csv_file("FOO,BAR\n1,2\n"), "salah.csv", "P", db_path)
+    assert database.load_from_db("P", db_path)["LOC_ID"].tolist() == ["101"]
@@ -0,0 +1,102 @@
+import os
+import zipfile
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import database
+import jobs
+from sqlite_pool import get_connection
+
+START = date(2024, 1, 1)
+END = date(2024, 1, 31)  # Periode lama: sudah settle
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # Folder PNG job (jobs.JOB_DIR) relatif ke cwd
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "test.db")
+    database.init_db(path)
+    return path
+
+
+def locations(*loc_ids):
+    return pd.DataFrame(
+        {"LOC_ID": list(loc_ids), "SITE_NAME": [f"Kec {x}" for x in loc_ids]}
+    )
+
+
+def open_job(db_path, loc_ids, start=START, end=END, fresh=False):
+    return jobs.open_bulk_job(
+        db_path, "P", "VO1", locations(*loc_ids), start, end, fresh=fresh
+    )
+
+
+def test_resume_skips_successful_checkpoints(db_path):
+    job_id = open_job(db_path, ["1", "2", "3"])
+    jobs.checkpoint_success(db_path, job_id, "1", "1.png", b"png-1")
+    jobs.checkpoint_failure(db_path, job_id, "2", "error", "Upstream Down")
+
+    # Run putus lalu diulang dengan parameter sama -> job yang sama
+    assert open_job(db_path, ["1", "2", "3"]) == job_id
+    assert jobs.todo_locations(db_path, job_id) == {"2", "3"}
+    assert jobs.find_job(db_path, "P", "VO1", START, END)["counts"] == {
+        "success": 1,
+        "error": 1,
+        "pending": 1,
+    }
+
+    # PNG checkpoint hilang dari disk -> dirender ulang
+    os.remove(os.path.join(jobs.job_dir(job_id), "1.png"))
+    assert jobs.todo_locations(db_path, job_id) == {"1", "2", "3"}
+
+
+def test_finish_zips_checkpoints_and_done_job_restarts(db_path, tmp_path):
+    job_id = open_job(db_path, ["1", "2"])
+    jobs.checkpoint_success(db_path, job_id, "1", "1.png", b"png-1")
+    jobs.checkpoint_failure(db_path, job_id, "2", "empty", "No Data")
+    result = jobs.finish_job(db_path, job_id, "P", ["1", "2"], str(tmp_path / "a.zip"))
+    assert result["success_count"] == 1
+    assert result["failures"] == {"No Data": 1}
+    with zipfile.ZipFile(result["zip_path"]) as zf:
+        assert sorted(zf.namelist()) == [jobs.ERROR_LOG_NAME, "1.png"]
+    assert jobs.find_job(db_path, "P", "VO1", START, END)["status"] == "partial"
+
+    jobs.checkpoint_success(db_path, job_id, "2", "2.png", b"png-2")
+    jobs.finish_job(db_path, job_id, "P", ["1", "2"], str(tmp_path / "b.zip"))
+    assert jobs.find_job(db_path, "P", "VO1", START, END)["status"] == "done"
+
+    # Job yang sudah selesai dijalankan ulang dari awal, bukan dipakai sebagai cache
+    assert open_job(db_path, ["1", "2"]) == job_id
+    assert jobs.todo_locations(db_path, job_id) == {"1", "2"}
+    assert not os.listdir(jobs.job_dir(job_id))
+
+
+def test_fresh_discards_checkpoints(db_path):
+    job_id = open_job(db_path, ["1", "2"])
+    jobs.checkpoint_success(db_path, job_id, "1", "1.png", b"png-1")
+    open_job(db_path, ["1", "2"], fresh=True)
+    assert jobs.todo_locations(db_path, job_id) == {"1", "2"}
+
+
+def test_unsettled_period_rerenders_old_checkpoints(db_path):
+    today = date.today()
+    start = today - timedelta(days=7)
+    assert not jobs.settled(today)
+    job_id = open_job(db_path, ["1", "2"], start=start, end=today)
+    jobs.checkpoint_success(db_path, job_id, "1", "1.png", b"png-1")
+    jobs.checkpoint_success(db_path, job_id, "2", "2.png", b"png-2")
+
+    # Checkpoint "1" dari run beberapa jam lalu, "2" dari run yang barusan putus
+    old = datetime.now() - timedelta(hours=jobs.RESUME_HOURS + 1)
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute(
+            "UPDATE bulk_job_items SET updated_at = ? WHERE job_id = ? AND loc_id = '1'",
+            (old.isoformat(timespec="seconds"), job_id),
+        )
+
+    assert open_job(db_path, ["1", "2"], start=start, end=today) == job_id
+    assert jobs.todo_locations(db_path, job_id) == {"1"}
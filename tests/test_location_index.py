@@ -0,0 +1,54 @@
+import pandas as pd
+
+from location_index import LocationIndex
+
+
+def make_index():
+    return LocationIndex(
+        pd.DataFrame(
+            {
+                "LOC_ID": ["A100", "B200", "C300", "A1000", "D400"],
+                "SITE_NAME": [
+                    "Kec Semarang Barat",
+                    "SMA Negeri 1",
+                    "Balai Desa Semarang",
+                    "Puskesmas Kota",
+                    None,
+                ],
+            }
+        )
+    )
+
+
+def labels(index, positions):
+    return [index.loc_ids[pos] for pos in positions]
+
+
+def test_exact_then_prefix_then_substring():
+    index = make_index()
+    # LOC_ID persis dulu, lalu prefix LOC_ID, lalu substring lain ("a100" di A1000)
+    assert labels(index, index.search("a100")) == ["A100", "A1000"]
+    # Prefix kata nama lokasi sebelum substring di tengah kata
+    assert labels(index, index.search("semarang")) == ["A100", "C300"]
+    assert labels(index, index.search("marang")) == ["A100", "C300"]
+    assert labels(index, index.search("negeri 1")) == ["B200"]
+
+
+def test_short_and_empty_queries():
+    index = make_index()
+    assert labels(index, index.search("")) == ["A100", "B200", "C300", "A1000", "D400"]
+    assert labels(index, index.search("d4")) == ["D400"]
+
+
+def test_fuzzy_only_when_nothing_matches():
+    index = make_index()
+    assert labels(index, index.search("puskesmaz"))[0] == "A1000"
+    assert index.search("qqqqqq") == []
+
+
+def test_page_returns_total():
+    index = make_index()
+    loc_ids, total = index.page("a", page=1, page_size=2)
+    assert total == len(index.search("a"))
+    assert loc_ids == labels(index, index.search("a"))[2:4]
+    assert index.page("a", page=10, page_size=2) == ([], total)
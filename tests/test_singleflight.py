@@ -0,0 +1,128 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def run_pair(flight, leader_fn, follower_fn, share_error=None):
+    # Leader mulai dulu dan menunggu sampai follower join, baru selesai
+    kwargs = {"share_error": share_error} if share_error else {}
+
+    async def main():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def leader():
+            started.set()
+            await release.wait()
+            return await leader_fn()
+
+        async def follower():
+            await started.wait()
+            task = asyncio.ensure_future(
+                flight.do_async("key", follower_fn, **kwargs)
+            )
+            await asyncio.sleep(0)
+            release.set()
+            return await task
+
+        leader_task = asyncio.ensure_future(flight.do_async("key", leader, **kwargs))
+        results = await asyncio.gather(leader_task, follower(), return_exceptions=True)
+        return results
+
+    return asyncio.run(main())
+
+
+def test_success_is_shared():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return "data"
+
+    assert run_pair(flight, fetch, fetch) == ["data", "data"]
+    assert len(calls) == 1
+    assert flight.stats()["shared"] == 1
+
+
+def test_shared_error_reaches_followers():
+    flight = SingleFlight()
+
+    async def down():
+        raise ValueError("upstream down")
+
+    leader, follower = run_pair(
+        flight, down, down, share_error=lambda exc: isinstance(exc, ValueError)
+    )
+    assert isinstance(leader, ValueError)
+    assert follower is leader
+
+
+def test_local_error_makes_follower_retry():
+    flight = SingleFlight()
+
+    async def cancelled():
+        raise KeyError("engine A cancelled")
+
+    async def fetch():
+        return "data"
+
+    leader, follower = run_pair(
+        flight, cancelled, fetch, share_error=lambda exc: isinstance(exc, ValueError)
+    )
+    assert isinstance(leader, KeyError)
+    assert follower == "data"
+
+
+def test_leader_cancellation_is_not_shared():
+    flight = SingleFlight()
+
+    async def main():
+        leader_started = asyncio.Event()
+
+        async def slow():
+            leader_started.set()
+            await asyncio.sleep(10)
+
+        async def fetch():
+            return "data"
+
+        leader = asyncio.ensure_future(flight.do_async("key", slow))
+        await leader_started.wait()
+        follower = asyncio.ensure_future(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "data"
+
+
+def test_sync_followers_share_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "data"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["calls"] < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["data"] * 3
+    assert len(calls) == 1
@@ -0,0 +1,67 @@
+import threading
+
+import sqlite_pool
+
+
+def test_one_connection_per_db_across_threads(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    conn = sqlite_pool.get_connection(db_path)
+    seen = []
+    thread = threading.Thread(
+        target=lambda: seen.append(sqlite_pool.get_connection(db_path))
+    )
+    thread.start()
+    thread.join()
+    assert seen == [conn]
+    sqlite_pool.close_connections()
+
+
+def test_concurrent_transactions_do_not_mix(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    conn = sqlite_pool.get_connection(db_path)
+    with conn:
+        conn.execute("CREATE TABLE t (worker INTEGER)")
+
+    def write(worker):
+        conn = sqlite_pool.get_connection(db_path)
+        for _ in range(50):
+            try:
+                with conn:
+                    conn.execute("INSERT INTO t VALUES (?)", (worker,))
+                    raise ValueError  # rollback hanya transaksi thread ini
+            except ValueError:
+                pass
+            with conn:
+                conn.execute("INSERT INTO t VALUES (?)", (worker,))
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counts = dict(conn.execute("SELECT worker, COUNT(*) FROM t GROUP BY worker"))
+    assert counts == {0: 50, 1: 50, 2: 50, 3: 50}
+    sqlite_pool.close_connections()
+
+
+def test_reads_do_not_wait_for_writers(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    conn = sqlite_pool.get_connection(db_path)
+    with conn:
+        conn.execute("CREATE TABLE t (worker INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    counts = []
+    reader = threading.Thread(
+        target=lambda: counts.append(conn.execute("SELECT COUNT(*) FROM t").fetchone())
+    )
+    with conn:
+        conn.execute("INSERT INTO t VALUES (2)")
+        reader.start()
+        reader.join(timeout=5)
+        # Pembaca selesai selagi transaksi tulis masih terbuka, dan tidak
+        # melihat baris yang belum di-commit
+        assert not reader.is_alive()
+    assert counts == [(1,)]
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (2,)
+    sqlite_pool.close_connections()
@@ -0,0 +1,57 @@
+import pytest
+
+from summary import SUMMARY_COLUMNS, SummaryCollector, top_n
+from usage_series import BYTES_PER_GB, UsageSeries
+
+
+def gb(*values):
+    return [int(v * BYTES_PER_GB) for v in values]
+
+
+def make_collector():
+    collector = SummaryCollector()
+    # Hari ke-3 tanpa usage: tidak dihitung hari aktif, growth-nya -100%
+    collector.add("A", UsageSeries([0, 1, 2, 3], [3, 5, 4, 0], gb(1, 2, 3, 0)))
+    collector.add("B", UsageSeries([5], [1], gb(10)))
+    # Lokasi gagal / tanpa data tidak ikut rekap
+    collector.add("C", None)
+    collector.add("D", UsageSeries([], [], []))
+    return collector
+
+
+def test_aggregates_per_location():
+    collector = make_collector()
+    assert len(collector) == 2
+    df = collector.summarize({"A": "Kec A", "B": "Kec B"})
+    assert list(df.columns) == SUMMARY_COLUMNS
+    # Urut Total Usage terbesar dulu
+    assert df["LOC ID"].tolist() == ["B", "A"]
+    row = df.set_index("LOC ID").loc["A"]
+    assert row["Kecamatan/Lokasi"] == "Kec A"
+    assert row["Total Usage (GB)"] == 6.0
+    assert row["Rata-rata (GB)"] == 1.5
+    assert row["Peak User"] == 5
+    assert row["Hari Aktif"] == 3
+    assert row["Growth Harian (%)"] == pytest.approx((100 + 50 - 100) / 3, abs=0.05)
+    row = df.set_index("LOC ID").loc["B"]
+    assert (row["Total Usage (GB)"], row["Hari Aktif"], row["Growth Harian (%)"]) == (
+        10.0,
+        1,
+        0.0,
+    )
+
+
+def test_columns_sorted_per_location_then_day():
+    collector = SummaryCollector()
+    collector.add("A", UsageSeries([2, 0], [1, 1], [20, 0]))
+    collector.add("B", UsageSeries([1], [1], [10]))
+    loc_index, days, _, usage = collector.columns()
+    assert loc_index.tolist() == [0, 0, 1]
+    assert days.tolist() == [0, 2, 1]
+    assert usage.tolist() == [0, 20, 10]
+
+
+def test_empty_collector_and_top_n():
+    assert SummaryCollector().summarize().empty
+    df = make_collector().summarize()
+    assert top_n(df, 1)["LOC ID"].tolist() == ["B"]
@@ -0,0 +1,57 @@
+import numpy as np
+
+import usage_cache
+from usage_cache import ENTRY_OVERHEAD, UsageCache
+from usage_series import UsageSeries
+
+
+def make_series(n_days):
+    return UsageSeries(np.arange(n_days), np.ones(n_days), np.ones(n_days))
+
+
+def test_lru_eviction_by_bytes():
+    series = [make_series(10) for _ in range(3)]
+    entry_size = series[0].nbytes + ENTRY_OVERHEAD
+    cache = UsageCache(max_bytes=entry_size * 2, ttl=60)
+    cache.put("a", series[0])
+    cache.put("b", series[1])
+    # "a" baru dipakai -> "b" yang paling lama tidak dipakai, dia yang dibuang
+    assert cache.get("a") is series[0]
+    cache.put("c", series[2])
+    assert cache.get("b") is None
+    assert cache.get("a") is series[0]
+    assert cache.get("c") is series[2]
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == entry_size * 2
+    assert stats["evictions"] == 1
+
+
+def test_oversized_and_failed_results_are_not_cached():
+    cache = UsageCache(max_bytes=ENTRY_OVERHEAD + 10, ttl=60)
+    cache.put("besar", make_series(100))
+    cache.put("gagal", None)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_put_makes_arrays_read_only():
+    cache = UsageCache(max_bytes=1024**2, ttl=60)
+    series = make_series(5)
+    cache.put("a", series)
+    assert not series.usage_bytes.flags.writeable
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(usage_cache.time, "monotonic", lambda: now[0])
+    cache = UsageCache(max_bytes=1024**2, ttl=60)
+    series = make_series(5)
+    cache.put("a", series)
+    now[0] += 59
+    assert cache.get("a") is series
+    now[0] += 1
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (0, 0)
+    assert (stats["hits"], stats["misses"]) == (1, 1)
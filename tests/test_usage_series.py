@@ -0,0 +1,65 @@
+from datetime import date
+
+from usage_series import (
+    AUTO,
+    DAILY,
+    MONTHLY,
+    WEEKLY,
+    UsageSeries,
+    day_number,
+    resolve_granularity,
+)
+
+
+def make_series():
+    rows = [
+        (date(2023, 12, 30), 2, 100),  # Sabtu
+        (date(2023, 12, 31), 4, 200),  # Minggu
+        (date(2024, 1, 1), 1, 300),  # Senin
+        (date(2024, 1, 2), 2, 400),
+        (date(2024, 2, 1), 7, 500),  # Kamis
+    ]
+    return UsageSeries.from_rows([(day_number(d), u, b) for d, u, b in rows])
+
+
+def bucket_dates(series):
+    return [day for day, _, _ in series]
+
+
+def test_weekly_buckets_start_on_monday():
+    weekly = make_series().resample(WEEKLY)
+    assert bucket_dates(weekly) == [
+        date(2023, 12, 25),
+        date(2024, 1, 1),
+        date(2024, 1, 29),
+    ]
+    # Usage dijumlah, user = rata-rata user harian di bucket
+    assert weekly.usage_bytes.tolist() == [300, 700, 500]
+    assert weekly.users.tolist() == [3, 2, 7]
+
+
+def test_monthly_buckets_start_on_first_day():
+    monthly = make_series().resample(MONTHLY)
+    assert bucket_dates(monthly) == [
+        date(2023, 12, 1),
+        date(2024, 1, 1),
+        date(2024, 2, 1),
+    ]
+    assert monthly.usage_bytes.tolist() == [300, 700, 500]
+    assert monthly.users.tolist() == [3, 2, 7]
+    assert monthly.total_usage_gb == make_series().total_usage_gb
+
+
+def test_daily_and_empty_are_unchanged():
+    series = make_series()
+    assert series.resample(DAILY) is series
+    assert UsageSeries.from_rows([]).resample(WEEKLY).empty
+
+
+def test_auto_granularity_follows_period_length():
+    start = date(2024, 1, 1)
+    assert resolve_granularity(AUTO, start, date(2024, 3, 2)) == DAILY
+    assert resolve_granularity(AUTO, start, date(2024, 3, 3)) == WEEKLY
+    assert resolve_granularity(AUTO, start, date(2024, 12, 31)) == WEEKLY
+    assert resolve_granularity(AUTO, start, date(2025, 1, 1)) == MONTHLY
+    assert resolve_granularity(MONTHLY, start, start) == MONTHLY
@@ -0,0 +1,19 @@
+from datetime import date, timedelta
+
+import database
+import usage_store
+
+
+def test_today_is_fresh_for_a_short_window(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.db")
+    database.init_db(db_path)
+    today = date.today()
+    start_date = today - timedelta(days=5)
+    usage_store.save_range(db_path, "1", "10", start_date, today, [])
+    assert usage_store.missing_ranges(db_path, "1", "10", start_date, today) == []
+
+    monkeypatch.setattr(usage_store, "TODAY_FRESH_MINUTES", 0)
+    # Hari lampau tetap pakai FRESH_HOURS, hanya hari ini yang di-fetch ulang
+    assert usage_store.missing_ranges(db_path, "1", "10", start_date, today) == [
+        (today, today)
+    ]
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+# --- USAGE CACHE (LRU DENGAN BATAS BYTE) ---
+# Pengganti st.cache_data untuk data usage: satu cache per proses, dipakai
+# bersama Tab 1 dan fetch_engine (bulk / summary). Key tanpa session_id
+# (vo_id, loc_id, periode), jadi login ulang tidak menyimpan data yang sama
+# dua kali. Isi cache berupa UsageSeries dengan array read-only: get()
+# mengembalikan objek yang sama (zero-copy), tidak di-pickle / di-copy.
+# Total ukuran array dibatasi USAGE_CACHE_MB; entry paling lama tidak
+# dipakai dibuang duluan.
+
+USAGE_CACHE_MB = int(os.environ.get("USAGE_CACHE_MB", "128"))
+USAGE_CACHE_TTL = 3600  # Sama seperti ttl st.cache_data sebelumnya
+ENTRY_OVERHEAD = 512  # Perkiraan overhead objek Python per entry (bytes)
+
+
+class UsageCache:
+    def __init__(self, max_bytes=USAGE_CACHE_MB * 1024**2, ttl=USAGE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (series, size, expires_at)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        metrics.inc("cache_requests_total", cache="memory")
+        if entry is None:
+            metrics.inc("cache_misses_total", cache="memory")
+            return None
+        return entry[0]
+
+    def put(self, key, series):
+        # Hasil gagal (None) tidak di-cache supaya bisa dicoba lagi
+        if series is None:
+            return
+        for array in (series.days, series.users, series.usage_bytes):
+            array.flags.writeable = False
+        size = series.nbytes + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (series, size, time.monotonic() + self.ttl)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                evicted += 1
+            self.evictions += evicted
+
+        if evicted:
+            metrics.inc("cache_evictions_total", evicted, cache="memory")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Dipakai bersama Tab 1 (app.py) dan fetch_engine, key = singleflight.usage_key
+usage_cache = UsageCache()
@@ -0,0 +1,131 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# --- USAGE SERIES (ARRAY RINGKAS PER LOKASI) ---
+# Data harian satu lokasi disimpan sebagai 3 array numpy bertipe tetap
+# (hari int32 sejak 1970-01-01, user int32, bytes int64), bukan DataFrame.
+# Summary (total / rata-rata) dihitung langsung dari array; DataFrame baru
+# dibuat kalau memang perlu chart (to_frame). Iterasi menghasilkan tuple
+# (date, connected_user, usage_bytes), sama seperti records lama.
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+BYTES_PER_GB = 1024**3
+
+# --- GRANULARITAS (HARIAN / MINGGUAN / BULANAN) ---
+# Data dari wifi.id & usage_store tetap harian; untuk periode panjang series
+# diringkas per minggu (mulai Senin) atau per bulan sebelum jadi chart, jadi
+# jumlah titik chart tetap kecil walau laporan setahun.
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+AUTO = "auto"
+GRANULARITIES = [AUTO, DAILY, WEEKLY, MONTHLY]
+AUTO_DAILY_MAX_DAYS = 62  # <= 2 bulan: harian
+AUTO_WEEKLY_MAX_DAYS = 366  # <= 1 tahun: mingguan, lebih dari itu bulanan
+
+
+def day_number(day):
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def resolve_granularity(granularity, start_date, end_date):
+    # "auto" -> daily / weekly / monthly sesuai panjang periode
+    if granularity != AUTO:
+        return granularity
+    days = (end_date - start_date).days + 1
+    if days <= AUTO_DAILY_MAX_DAYS:
+        return DAILY
+    if days <= AUTO_WEEKLY_MAX_DAYS:
+        return WEEKLY
+    return MONTHLY
+
+
+def _bucket_days(days, granularity):
+    # Hari pertama bucket (Senin / tanggal 1) untuk tiap hari
+    if granularity == WEEKLY:
+        # 1970-01-01 hari Kamis -> (days + 3) % 7 = 0 untuk hari Senin
+        return days - (days + 3) % 7
+    if granularity == MONTHLY:
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        return months.astype("datetime64[D]").astype(np.int32)
+    raise ValueError(f"Granularitas tidak dikenal: {granularity}")
+
+
+class UsageSeries:
+    __slots__ = ("days", "users", "usage_bytes")
+
+    def __init__(self, days, users, usage_bytes):
+        self.days = np.asarray(days, dtype=np.int32)
+        self.users = np.asarray(users, dtype=np.int32)
+        self.usage_bytes = np.asarray(usage_bytes, dtype=np.int64)
+        if len(self.days) > 1 and np.any(np.diff(self.days) < 0):
+            order = np.argsort(self.days, kind="stable")
+            self.days = self.days[order]
+            self.users = self.users[order]
+            self.usage_bytes = self.usage_bytes[order]
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: list (hari int, connected_user, usage_bytes), misal hasil query SQLite
+        if not rows:
+            return cls([], [], [])
+        days, users, usage = zip(*rows)
+        return cls(days, users, usage)
+
+    def __len__(self):
+        return len(self.days)
+
+    def __iter__(self):
+        for day, users, usage in zip(
+            self.days.tolist(), self.users.tolist(), self.usage_bytes.tolist()
+        ):
+            yield date.fromordinal(day + EPOCH_ORDINAL), users, usage
+
+    @property
+    def empty(self):
+        return len(self.days) == 0
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.users.nbytes + self.usage_bytes.nbytes
+
+    # --- SUMMARY TANPA DATAFRAME ---
+    @property
+    def total_usage_gb(self):
+        return int(self.usage_bytes.sum()) / BYTES_PER_GB
+
+    @property
+    def mean_usage_gb(self):
+        return self.total_usage_gb / len(self.days) if len(self.days) else 0.0
+
+    @property
+    def max_users(self):
+        return int(self.users.max()) if len(self.users) else 0
+
+    def resample(self, granularity):
+        # Usage dijumlah per bucket, user = rata-rata user harian di bucket itu
+        if granularity == DAILY or self.empty:
+            return self
+        buckets = _bucket_days(self.days, granularity)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        counts = np.diff(np.r_[starts, len(buckets)])
+        users = np.add.reduceat(self.users.astype(np.int64), starts)
+        return UsageSeries(
+            buckets[starts],
+            np.rint(users / counts),
+            np.add.reduceat(self.usage_bytes, starts),
+        )
+
+    def to_frame(self):
+        # Format lama fetch_usage_data: [date, connected_user, total_usage_gb]
+        if self.empty:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "date": self.days.astype("datetime64[D]").astype("datetime64[ns]"),
+                "connected_user": self.users.astype(int),
+                "total_usage_gb": self.usage_bytes / BYTES_PER_GB,
+            }
+        )
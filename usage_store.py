@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+
+import metrics
+from sqlite_pool import get_connection
+from usage_series import UsageSeries
+
+# --- USAGE STORE (DATA HARIAN PERSISTEN) ---
+# Data harian per lokasi disimpan di SQLite (tabel usage_daily), jadi range
+# tanggal yang sudah pernah ditarik tidak perlu didownload ulang dari wifi.id.
+# Hanya "lubang" tanggal yang belum ada + beberapa hari terakhir yang datanya
+# masih bisa berubah (belum settle) yang di-fetch lagi.
+
+# Data wifi.id untuk beberapa hari terakhir masih bisa naik (belum final).
+# Hari dianggap final kalau di-fetch minimal SETTLE_DAYS hari setelah tanggalnya.
+SETTLE_DAYS = 3
+# Hari lampau yang belum settle tapi sudah di-fetch setelah harinya lewat
+# (misalnya oleh warmer malam hari) dianggap cukup baru selama FRESH_HOURS,
+# jadi rekap pagi tidak menembak wifi.id lagi.
+FRESH_HOURS = 12
+# Hari ini (dan hari lain yang di-fetch di hari yang sama) masih terus naik,
+# tapi data yang di-fetch kurang dari TODAY_FRESH_MINUTES lalu tetap dipakai,
+# supaya rerun / buka tab lain tidak menembak wifi.id lagi untuk tiap lokasi.
+# Akibatnya angka hari ini bisa tertinggal paling lama sekian menit.
+TODAY_FRESH_MINUTES = 10
+
+
+def init_usage_table(conn):
+    # connected_user / usage_bytes NULL = hari sudah dicek tapi wifi.id
+    # tidak mengembalikan data (supaya tidak ditanya ulang terus).
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS usage_daily (
+            vo_id TEXT NOT NULL,
+            loc_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            connected_user INTEGER,
+            usage_bytes INTEGER,
+            fetched_at TEXT NOT NULL,
+            PRIMARY KEY (vo_id, loc_id, date)
+        )
+    """)
+
+
+def _days(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def _group_ranges(days):
+    # [1, 2, 3, 7, 8] -> [(1, 3), (7, 8)] supaya satu gap = satu request
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(r) for r in ranges]
+
+
+def missing_ranges(db_path, vo_id, loc_id, start_date, end_date):
+    with metrics.timed("sqlite"):
+        conn = get_connection(db_path)
+        rows = conn.execute(
+            """
+            SELECT date, fetched_at FROM usage_daily
+            WHERE vo_id = ? AND loc_id = ? AND date BETWEEN ? AND ?
+            """,
+            (str(vo_id), str(loc_id), start_date.isoformat(), end_date.isoformat()),
+        ).fetchall()
+
+    settled = set()
+    now = datetime.now()
+    fresh_since = now - timedelta(hours=FRESH_HOURS)
+    today_fresh_since = now - timedelta(minutes=TODAY_FRESH_MINUTES)
+    for day_str, fetched_at in rows:
+        day = datetime.strptime(day_str, "%Y-%m-%d").date()
+        fetched_at = datetime.fromisoformat(fetched_at)
+        fetched_day = fetched_at.date()
+        if fetched_day >= day + timedelta(days=SETTLE_DAYS):
+            settled.add(day)
+        elif fetched_day > day and fetched_at >= fresh_since:
+            settled.add(day)
+        elif fetched_at >= today_fresh_since:
+            settled.add(day)
+
+    missing = [d for d in _days(start_date, end_date) if d not in settled]
+    # Hit/miss dihitung per hari: hari yang sudah settle tidak ditanya ke wifi.id
+    metrics.inc(
+        "cache_requests_total", (end_date - start_date).days + 1, cache="usage_store"
+    )
+    metrics.inc("cache_misses_total", len(missing), cache="usage_store")
+    return _group_ranges(missing)
+
+
+def save_range(db_path, vo_id, loc_id, start_date, end_date, records):
+    # records: UsageSeries / list (date, connected_user, usage_bytes) hasil parse.
+    # Semua hari di range ditulis, yang tidak ada di response disimpan NULL.
+    by_day = {day: (users, usage) for day, users, usage in records}
+    fetched_at = datetime.now().isoformat(timespec="seconds")
+    data_tuples = [
+        (
+            str(vo_id),
+            str(loc_id),
+            day.isoformat(),
+            *by_day.get(day, (None, None)),
+            fetched_at,
+        )
+        for day in _days(start_date, end_date)
+    ]
+
+    with metrics.timed("sqlite"):
+        conn = get_connection(db_path)
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO usage_daily
+                    (vo_id, loc_id, date, connected_user, usage_bytes, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                data_tuples,
+            )
+
+
+def load_series(db_path, vo_id, loc_id, start_date, end_date):
+    # Tanggal langsung dikonversi SQLite ke nomor hari (int), tanpa parse di Python
+    with metrics.timed("sqlite"):
+        conn = get_connection(db_path)
+        rows = conn.execute(
+            """
+            SELECT CAST(julianday(date) - 2440587.5 AS INTEGER), connected_user, usage_bytes
+            FROM usage_daily
+            WHERE vo_id = ? AND loc_id = ? AND date BETWEEN ? AND ?
+                AND usage_bytes IS NOT NULL
+            ORDER BY date
+            """,
+            (str(vo_id), str(loc_id), start_date.isoformat(), end_date.isoformat()),
+        ).fetchall()
+
+    return UsageSeries.from_rows(rows)
+
+
+def fetch_series_with_store(db_path, fetch_range, vo_id, loc_id, start_date, end_date):
+    # fetch_range(start, end) -> UsageSeries / records, atau None kalau gagal fetch.
+    # Gap yang sudah berhasil tetap tersimpan walaupun gap berikutnya gagal.
+    for gap_start, gap_end in missing_ranges(
+        db_path, vo_id, loc_id, start_date, end_date
+    ):
+        records = fetch_range(gap_start, gap_end)
+        if records is None:
+            return None
+        save_range(db_path, vo_id, loc_id, gap_start, gap_end, records)
+
+    return load_series(db_path, vo_id, loc_id, start_date, end_date)
+
+
+def fetch_with_store(db_path, fetch_range, vo_id, loc_id, start_date, end_date):
+    # Versi DataFrame (chart / Tab 1)
+    series = fetch_series_with_store(
+        db_path, fetch_range, vo_id, loc_id, start_date, end_date
+    )
+    if series is None:
+        return None
+    with metrics.timed("frame"):
+        return series.to_frame()
@@ -0,0 +1,150 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import fetch_engine
+import metrics
+import reports
+import usage_store
+import wifi_api
+from concurrency import AimdController
+from config import DB_NAME, PROJECT_CONFIG
+from database import load_from_db, load_sessions
+
+# --- CACHE WARMER (PRE-FETCH MALAM HARI) ---
+# Rekap month-to-date pagi hari biasanya menembak wifi.id untuk semua lokasi
+# sekaligus di jam sibuk. Warmer menarik data kemarin (+ hari-hari yang belum
+# settle) untuk semua proyek di PROJECT_CONFIG saat sepi, dengan concurrency
+# rendah, langsung ke usage_store. Paginya Tab 1 / Tab 3 cukup baca SQLite
+# (lihat usage_store.FRESH_HOURS). Session yang dipakai = session terakhir
+# per proyek yang diisi di sidebar dashboard (tabel project_sessions).
+#
+# Jalan sebagai thread di proses dashboard (jam WARM_HOUR, -1 = mati) atau
+# dari cron: python cli.py warm
+
+WARM_HOUR = int(os.environ.get("WARM_HOUR", "2"))
+WARM_CONCURRENCY = 4
+NO_SESSION = "No Session"
+
+
+def warm_range(day):
+    # Hari terawal di range di-fetch >= SETTLE_DAYS setelahnya -> jadi final
+    return day - timedelta(days=usage_store.SETTLE_DAYS), day
+
+
+def warm(db_path=DB_NAME, day=None, concurrency=WARM_CONCURRENCY, sessions=None):
+    # -> {project_name: {"locations", "ok", "failures" (Counter)}}
+    day = day or date.today() - timedelta(days=1)
+    start_date, end_date = warm_range(day)
+    if sessions is None:
+        sessions = load_sessions(db_path)
+
+    results = {}
+    warmed = set()  # (vo_id, loc_id): proyek dengan vo_id sama cukup sekali
+    for project_name, config in PROJECT_CONFIG.items():
+        vo_id = config["vo_id"]
+        loc_ids = [
+            loc_id
+            for loc_id in load_from_db(project_name, db_path)["LOC_ID"]
+            if (vo_id, loc_id) not in warmed
+        ]
+        result = results[project_name] = {
+            "locations": len(loc_ids),
+            "ok": 0,
+            "failures": Counter(),
+        }
+        if not loc_ids:
+            continue
+
+        session_id = sessions.get(project_name)
+        try:
+            if not session_id:
+                raise wifi_api.FetchError(NO_SESSION)
+            reports.preflight(session_id, vo_id, loc_ids, end_date)
+        except wifi_api.FetchError as exc:
+            # Session kadaluarsa: proyek dilewati tanpa request per lokasi
+            result["failures"][exc.reason] = len(loc_ids)
+            metrics.inc("warmer_locations_total", len(loc_ids), status="skipped")
+            continue
+
+        for loc_id, series, reason in fetch_engine.fetch_many(
+            db_path,
+            session_id,
+            vo_id,
+            loc_ids,
+            start_date,
+            end_date,
+            controller=AimdController.fixed(concurrency),
+            as_series=True,
+        ):
+            if series is None:
+                result["failures"][reason] += 1
+            else:
+                result["ok"] += 1
+                warmed.add((vo_id, loc_id))
+        metrics.inc("warmer_locations_total", result["ok"], status="ok")
+        metrics.inc(
+            "warmer_locations_total", sum(result["failures"].values()), status="failed"
+        )
+    return results
+
+
+def format_results(results):
+    lines = []
+    for project_name, result in results.items():
+        line = f"{project_name}: {result['ok']}/{result['locations']} lokasi"
+        if result["failures"]:
+            line += f" ({reports.format_failures(result['failures'])})"
+        lines.append(line)
+    return lines
+
+
+# --- SCHEDULER (THREAD DI PROSES DASHBOARD) ---
+last_run = None  # {"finished_at", "results"} run terakhir, untuk Tab Admin
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def seconds_until(hour, now=None):
+    now = now or datetime.now()
+    run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+def _loop(db_path, hour):
+    global last_run
+    while True:
+        time.sleep(seconds_until(hour))
+        try:
+            results = warm(db_path)
+        except Exception:
+            traceback.print_exc()
+            continue
+        last_run = {"finished_at": datetime.now(), "results": results}
+        for line in format_results(results):
+            print(f"[warmer] {line}", file=sys.stderr)
+
+
+def start_scheduler(db_path=DB_NAME, hour=WARM_HOUR):
+    # Sekali per proses (aman dipanggil tiap rerun Streamlit).
+    # Return True kalau scheduler jalan.
+    global _thread
+    if multiprocessing.parent_process() is not None:
+        # Proses anak (multiprocessing) yang ikut meng-import app.py: warmer
+        # hanya boleh jalan di proses dashboard
+        return False
+    with _thread_lock:
+        if _thread is None and 0 <= hour <= 23:
+            _thread = threading.Thread(
+                target=_loop, args=(db_path, hour), name="cache-warmer", daemon=True
+            )
+            _thread.start()
+        return _thread is not None
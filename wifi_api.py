@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+from datetime import date
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from usage_series import UsageSeries, day_number
+
+# --- KONFIGURASI ENDPOINT WIFI.ID ---
+# WIFI_API_URL bisa diarahkan ke mock_server.py untuk benchmark / testing offline
+PLINECHART_URL = os.environ.get(
+    "WIFI_API_URL", "https://venue.wifi.id/vdash/dashboard/plinechart?"
+)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Timeout dinaikkan ke 60 detik karena server USA ke Indo pasti delay
+REQUEST_TIMEOUT = 60
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 1
+RETRY_STATUS = [500, 502, 503, 504]
+AUTH_STATUS = [401, 403]
+PREFLIGHT_TIMEOUT = 15  # Probe session cukup sekali, tanpa retry
+
+# --- ALASAN GAGAL FETCH ---
+# Dibedakan supaya log error & circuit breaker tahu mana session kadaluarsa,
+# mana server wifi.id yang bermasalah, dan mana lokasi yang memang kosong.
+SESSION_INVALID = "Session Invalid"
+UPSTREAM_DOWN = "Upstream Down"
+NO_DATA = "No Data Available"
+
+
+class FetchError(Exception):
+    def __init__(self, reason, detail=""):
+        super().__init__(f"{reason} ({detail})" if detail else reason)
+        self.reason = reason
+
+
+def build_headers(session_id):
+    return {
+        "User-Agent": USER_AGENT,
+        "Cookie": f"PHPSESSID={session_id}",
+        "X-Requested-With": "XMLHttpRequest",
+        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    }
+
+
+def build_payload(vo_id, loc_id, start_date, end_date):
+    return {
+        "optionsRadios": "3",
+        "startdate": start_date.strftime("%Y%m%d"),
+        "enddate": end_date.strftime("%Y%m%d"),
+        "rr": "3",
+        "vo": vo_id,
+        "level": "l2",
+        "locid": loc_id,
+        "namasite": "JATENG",
+        "ap": "",
+        "kota": "",
+        "ssid": "",
+        "sitename": "",
+    }
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _periode_day(value):
+    # "20260101" -> nomor hari sejak 1970-01-01 (tanpa strptime per baris)
+    periode = int(value)
+    return day_number(date(periode // 10000, periode // 100 % 100, periode % 100))
+
+
+def parse_usage_records(data):
+    # Response wifi.id: list of {"PERIODE": "20260101", "USAGES": ..., "TRAFIK": ...}
+    # Langsung jadi UsageSeries (array int), tanpa DataFrame per lokasi.
+    if not data:
+        return UsageSeries([], [], [])
+
+    if isinstance(data, dict):
+        keys = list(data.keys())
+        data = [dict(zip(keys, values)) for values in zip(*data.values())]
+
+    days, users, usage = [], [], []
+    for item in data:
+        try:
+            days.append(_periode_day(item["PERIODE"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+        users.append(_to_int(item.get("TRAFIK")))
+        usage.append(_to_int(item.get("USAGES")))
+    return UsageSeries(days, users, usage)
+
+
+def decode_response(status, body):
+    # -> data JSON, atau raise FetchError. PHPSESSID kadaluarsa dibalas wifi.id
+    # dengan halaman login (HTML / redirect), bukan JSON.
+    if status in AUTH_STATUS or 300 <= status < 400:
+        raise FetchError(SESSION_INVALID, f"HTTP {status}")
+    if status != 200:
+        raise FetchError(UPSTREAM_DOWN, f"HTTP {status}")
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise FetchError(SESSION_INVALID, "bukan JSON, kemungkinan halaman login")
+
+
+# --- SESSION HTTP (SYNC) ---
+def create_http_session():
+    session = requests.Session()
+    retries = Retry(
+        total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUS
+    )
+    session.mount("https://", HTTPAdapter(max_retries=retries))
+    session.mount("http://", HTTPAdapter(max_retries=retries))
+    return session
+
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def get_http_session():
+    # Satu session keep-alive per proses (dashboard), dipakai bersama semua
+    # user. PHPSESSID selalu dikirim lewat header per request; cookie dari
+    # response tidak disimpan supaya session user tidak tercampur.
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = create_http_session()
+            _http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return _http
+
+
+def fetch_daily_records(http, session_id, vo_id, loc_id, start_date, end_date):
+    # Return UsageSeries (date, connected_user, usage_bytes), atau None kalau gagal.
+    try:
+        with metrics.timed("fetch"):
+            response = http.post(
+                PLINECHART_URL,
+                headers=build_headers(session_id),
+                data=build_payload(vo_id, loc_id, start_date, end_date),
+                verify=False,
+                timeout=REQUEST_TIMEOUT,
+            )
+            body = response.content
+
+        metrics.inc("http_requests_total", status=response.status_code)
+        metrics.inc("http_bytes_total", len(body))
+        # Retry urllib3 tercatat di history response (kalau ada)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            metrics.inc("http_retries_total", len(retries.history))
+
+        if response.status_code != 200:
+            return None
+
+        with metrics.timed("parse"):
+            try:
+                data = response.json()
+            except ValueError:
+                return None
+
+            return parse_usage_records(data)
+
+    except Exception:
+        metrics.inc("http_requests_total", status="error")
+        return None
+
+
+def check_session(session_id, vo_id, loc_id, day):
+    # Preflight sebelum run bulk / summary: satu request 1 hari, tanpa retry.
+    # Return None kalau session OK, atau alasan gagal (SESSION_INVALID /
+    # UPSTREAM_DOWN) -- jauh lebih cepat daripada ratusan request yang gagal.
+    try:
+        with metrics.timed("fetch"):
+            response = requests.post(
+                PLINECHART_URL,
+                headers=build_headers(session_id),
+                data=build_payload(vo_id, loc_id, day, day),
+                verify=False,
+                timeout=PREFLIGHT_TIMEOUT,
+            )
+    except requests.RequestException:
+        metrics.inc("http_requests_total", status="error")
+        return UPSTREAM_DOWN
+
+    metrics.inc("http_requests_total", status=response.status_code)
+    try:
+        decode_response(response.status_code, response.content)
+    except FetchError as exc:
+        return exc.reason
+    return None